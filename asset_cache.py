@@ -0,0 +1,148 @@
+"""
+Asset Cache
+On-disk, content-addressed cache for the image and document build scripts
+Broader AI
+
+Entries are keyed by a hash of the source content plus the processing
+parameters, so a result is reused only when neither has changed. The cache
+is bounded by total size; the least recently used entries are evicted first
+(an entry's mtime is bumped every time it is read).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(*parts):
+    """Stable key for any mix of digests, strings and JSON-serialisable parameters"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ContentCache:
+    def __init__(self, name, root=CACHE_ROOT, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.path.join(root, name)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def load(self, key):
+        """Cached bytes for key, or None"""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self._touch(path)
+        self.hits += 1
+        return data
+
+    def fetch_file(self, key, destination):
+        """Copy the cached entry to destination; False on a miss"""
+        path = self.path_for(key)
+        if not self._touch(path):
+            self.misses += 1
+            return False
+        try:
+            shutil.copyfile(path, destination)
+        except FileNotFoundError:
+            # Evicted by another process between the touch and the copy
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key, data):
+        self._write(key, lambda f: f.write(data))
+
+    def store_file(self, key, source):
+        def copy(f):
+            with open(source, 'rb') as src:
+                shutil.copyfileobj(src, f)
+        self._write(key, copy)
+
+    def _write(self, key, writer):
+        # Write to a temp file and rename so readers never see a partial entry
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                writer(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.stores += 1
+
+    def entries(self):
+        """(mtime, size, path) for every entry"""
+        found = []
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, stat.st_size, entry.path))
+        return found
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+        return total
+
+    def report(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return (f'{self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), '
+                f'{self.stores} stored, {self.evictions} evicted')
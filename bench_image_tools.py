@@ -0,0 +1,222 @@
+"""
+Image Tools Benchmark
+Repeatable, offline timings for the keying modes in remove_bg.py
+Broader AI
+
+Every case runs in a fresh worker process on a synthetic RGBA image (a
+white canvas with a logo-like shape, anti-aliased edges, an enclosed white
+area and light noise), so peak RSS is measured per case. Only the keying is
+timed; decoding and PNG encoding are left out. The legacy per-pixel loop is
+the original remove_bg.py algorithm and is capped at small sizes because it
+needs tens of bytes per pixel.
+
+Usage:
+    python bench_image_tools.py                          # run and print
+    python bench_image_tools.py --save                   # run and store as the baseline
+    python bench_image_tools.py --compare --threshold 10 # flag >10% regressions (exit 1)
+    python bench_image_tools.py --sizes 0.25 1 4 --modes vectorized flood
+"""
+
+from PIL import Image
+import numpy as np
+import multiprocessing
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+
+import remove_bg
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_image_tools_baseline.json')
+
+SIZES_MP = (0.25, 1, 4, 16, 64)
+MODES = ('loop', 'vectorized', 'soft', 'flood')
+LOOP_MAX_MP = 1
+REGRESSION_THRESHOLD = 15.0
+
+
+def synthetic_image(megapixels, seed=0):
+    """Deterministic H x W x 4 test image of roughly the given size, built in row chunks"""
+    side = int(round((megapixels * 1_000_000) ** 0.5))
+    rng = np.random.default_rng(seed)
+    pixels = np.empty((side, side, 4), dtype=np.uint8)
+    cx = cy = side / 2
+    outer, inner = side * 0.35, side * 0.15
+    x = np.arange(side, dtype=np.float32)
+    for top in range(0, side, 256):
+        y = np.arange(top, min(top + 256, side), dtype=np.float32)[:, None]
+        radius = np.sqrt((x - cx) ** 2 + (y - cy) ** 2)
+        # Ring with 2 px anti-aliased edges and a white hole in the middle
+        coverage = np.clip(outer - radius, 0, 2) / 2 * np.clip(radius - inner, 0, 2) / 2
+        noise = rng.integers(0, 6, size=coverage.shape, dtype=np.uint8)
+        chunk = pixels[top:top + len(y)]
+        chunk[..., 0] = 255 - coverage * (255 - 99) - noise
+        chunk[..., 1] = 255 - coverage * (255 - 102) - noise
+        chunk[..., 2] = 255 - coverage * (255 - 241) - noise
+        chunk[..., 3] = 255
+    return pixels
+
+
+def key_loop(pixels):
+    """The original remove_bg.py: walk getdata() in Python and putdata() a list of tuples"""
+    img = Image.fromarray(pixels, 'RGBA')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        data = img.getdata()
+        new_data = []
+        for item in data:
+            if item[0] > 240 and item[1] > 240 and item[2] > 240:
+                new_data.append((255, 255, 255, 0))
+            else:
+                new_data.append(item)
+        img.putdata(new_data)
+    return img
+
+
+KEYERS = {
+    'loop': key_loop,
+    'vectorized': lambda pixels: remove_bg.key_pixels(pixels, 'hard'),
+    'soft': lambda pixels: remove_bg.key_pixels(pixels, 'soft'),
+    'flood': lambda pixels: remove_bg.key_pixels(pixels, 'flood'),
+}
+
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+
+    GetCurrentProcess = ctypes.windll.kernel32.GetCurrentProcess
+    GetCurrentProcess.restype = wintypes.HANDLE
+    GetProcessMemoryInfo = ctypes.windll.psapi.GetProcessMemoryInfo
+    GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+    GetProcessMemoryInfo.restype = wintypes.BOOL
+
+    def peak_rss_mb():
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if not GetProcessMemoryInfo(GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            raise ctypes.WinError()
+        # The peak working set is Windows' counterpart of ru_maxrss
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+else:
+    import resource
+
+    def peak_rss_mb():
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(case):
+    """Runs in a fresh process: returns timings and peak memory for one (mode, size)"""
+    mode, megapixels, repeat = case
+    source = synthetic_image(megapixels)
+    input_rss = peak_rss_mb()
+    times = []
+    for _ in range(repeat):
+        pixels = source.copy()
+        start = time.perf_counter()
+        KEYERS[mode](pixels)
+        times.append(time.perf_counter() - start)
+        del pixels
+    actual_mp = source.shape[0] * source.shape[1] / 1_000_000
+    best = min(times)
+    return {
+        'mode': mode,
+        'megapixels': megapixels,
+        'seconds': best,
+        'mp_per_s': actual_mp / best if best else float('inf'),
+        'peak_rss_mb': peak_rss_mb(),
+        'rss_over_input_mb': peak_rss_mb() - input_rss,
+    }
+
+
+def run_benchmarks(sizes, modes, repeat=3, loop_max_mp=LOOP_MAX_MP):
+    cases = [(mode, size, repeat) for size in sizes for mode in modes
+             if mode != 'loop' or size <= loop_max_mp]
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for case in cases:
+        # One process per case so the peak RSS belongs to that case alone
+        with context.Pool(1) as pool:
+            result = pool.apply(run_case, (case,))
+        results.append(result)
+        print(format_result(result), flush=True)
+    return results
+
+
+def format_result(result):
+    return (f"  {result['mode']:<11} {result['megapixels']:>6g} MP  {result['seconds'] * 1000:10.1f} ms  "
+            f"{result['mp_per_s']:9.2f} MP/s  {result['peak_rss_mb']:8.1f} MB peak  "
+            f"(+{result['rss_over_input_mb']:.1f} MB)")
+
+
+def compare(results, baseline, threshold):
+    """Lines describing throughput drops and memory growth beyond threshold percent"""
+    previous = {(r['mode'], r['megapixels']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['mode'], result['megapixels']))
+        if before is None:
+            continue
+        slower = (before['mp_per_s'] - result['mp_per_s']) / before['mp_per_s'] * 100
+        heavier = (result['peak_rss_mb'] - before['peak_rss_mb']) / before['peak_rss_mb'] * 100
+        label = f"{result['mode']} @ {result['megapixels']:g} MP"
+        if slower > threshold:
+            regressions.append(f'  {label}: throughput {before["mp_per_s"]:.2f} -> '
+                               f'{result["mp_per_s"]:.2f} MP/s ({slower:.0f}% slower)')
+        if heavier > threshold:
+            regressions.append(f'  {label}: peak RSS {before["peak_rss_mb"]:.0f} -> '
+                               f'{result["peak_rss_mb"]:.0f} MB ({heavier:.0f}% more)')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the remove_bg.py keying modes.')
+    parser.add_argument('--sizes', type=float, nargs='+', default=SIZES_MP, help='image sizes in megapixels')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case; the fastest is kept')
+    parser.add_argument('--loop-max-mp', type=float, default=LOOP_MAX_MP,
+                        help='largest size to run the legacy per-pixel loop on (default: %(default)s)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON (default: %(default)s)')
+    parser.add_argument('--save', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--compare', action='store_true', help='compare against the baseline')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='percent slowdown or memory growth counted as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.modes, args.repeat, args.loop_max_mp)
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'machine': platform.platform(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'results': results,
+            }, f, indent=2)
+        print(f'\n  Baseline saved to {args.baseline}')
+
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n  Regressions over {args.threshold:g}% against {args.baseline}:')
+            print('\n'.join(regressions))
+            sys.exit(1)
+        print(f'\n  No regressions over {args.threshold:g}% against {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Density Generator
+Builds every launcher icon and splash density from its master image
+Broader AI
+
+Covers web/icons, web/favicon.png, web/splash/img/{light,dark}-{1x..4x}.png,
+the Android mipmaps, the iOS and macOS asset catalogs and the Windows icon
+(the targets of flutter_launcher_icons.yaml and flutter_native_splash.yaml).
+
+Each master is decoded once. Its densities are resized largest first, each
+one from the next larger density with Lanczos resampling rather than from
+the full-size master. Masters are spread over a process pool
+and PNG encoding inside a master runs on threads (Pillow releases the GIL
+while deflating). An output is skipped when its recorded hash shows it was
+already generated from the current master with the current settings.
+
+Usage:
+    python generate_densities.py            # regenerate what is out of date
+    python generate_densities.py --dry-run  # list what would be regenerated
+    python generate_densities.py --force
+"""
+
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+import argparse
+import json
+import os
+import time
+
+from asset_cache import CACHE_ROOT, cache_key, file_digest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(CACHE_ROOT, 'densities.json')
+# Bump whenever resampling or encoding settings change
+GENERATOR_VERSION = 1
+
+APP_ICON = 'assets/icon/app_icon.png'
+SPLASH_IMAGE = 'assets/icon/jk.screen.png'
+SPLASH_1X = (256, 384)
+
+ANDROID_MIPMAPS = {'mdpi': 48, 'hdpi': 72, 'xhdpi': 96, 'xxhdpi': 144, 'xxxhdpi': 192}
+WINDOWS_ICON_SIZE = 48
+
+
+def asset_catalog_targets(folder):
+    """(path, (w, h)) for every icon listed in an Xcode .appiconset Contents.json"""
+    with open(os.path.join(ROOT, folder, 'Contents.json')) as f:
+        images = json.load(f)['images']
+    targets = {}
+    for image in images:
+        if 'filename' not in image or 'size' not in image:
+            continue
+        # iPhone and iPad entries share files, so each filename is listed once
+        points = float(image['size'].split('x')[0])
+        pixels = round(points * int(image['scale'].rstrip('x')))
+        targets.setdefault(f'{folder}/{image["filename"]}', (pixels, pixels))
+    return list(targets.items())
+
+
+def build_manifest():
+    """master path -> list of (output path, (width, height)), all relative to the repo root"""
+    icon = [
+        ('web/icons/Icon-192.png', (192, 192)),
+        ('web/icons/Icon-512.png', (512, 512)),
+        ('web/icons/Icon-maskable-192.png', (192, 192)),
+        ('web/icons/Icon-maskable-512.png', (512, 512)),
+        ('web/favicon.png', (16, 16)),
+        ('windows/runner/resources/app_icon.ico', (WINDOWS_ICON_SIZE, WINDOWS_ICON_SIZE)),
+    ]
+    icon += [(f'android/app/src/main/res/mipmap-{density}/launcher_icon.png', (size, size))
+             for density, size in ANDROID_MIPMAPS.items()]
+    icon += asset_catalog_targets('ios/Runner/Assets.xcassets/AppIcon.appiconset')
+    icon += asset_catalog_targets('macos/Runner/Assets.xcassets/AppIcon.appiconset')
+
+    width, height = SPLASH_1X
+    splash = [(f'web/splash/img/{theme}-{scale}x.png', (width * scale, height * scale))
+              for theme in ('light', 'dark') for scale in range(1, 5)]
+    splash += [(f'ios/Runner/Assets.xcassets/LaunchImage.imageset/LaunchImage{suffix}.png',
+                (width * scale, height * scale))
+               for scale, suffix in ((1, ''), (2, '@2x'), (3, '@3x'))]
+    return {APP_ICON: icon, SPLASH_IMAGE: splash}
+
+
+def target_key(master_digest, size, path):
+    return cache_key(GENERATOR_VERSION, master_digest, list(size), os.path.splitext(path)[1].lower())
+
+
+def load_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    with open(STATE_PATH, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def is_up_to_date(state, path, key):
+    record = state.get(path)
+    full_path = os.path.join(ROOT, path)
+    return (record is not None and record['key'] == key and os.path.exists(full_path)
+            and record['digest'] == file_digest(full_path))
+
+
+def encode(img, ext):
+    out = BytesIO()
+    if ext == '.ico':
+        img.save(out, 'ICO', sizes=[img.size])
+    else:
+        img.save(out, 'PNG', compress_level=9)
+    return out.getvalue()
+
+
+def render_master(job):
+    """Decode one master, resize down the density chain and write the stale outputs.
+
+    job is (master, every (path, size) of the master, paths to write). Every
+    size of the manifest goes through the chain, even when only some outputs
+    are stale, so a density always comes out the same however it was reached.
+    Returns [(path, seconds to encode and write)].
+    """
+    master, targets, stale = job
+    with Image.open(os.path.join(ROOT, master)) as img:
+        img.load()
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+        current = img.convert('RGBA' if has_alpha else 'RGB')
+
+    by_size = {}
+    for path, size in targets:
+        by_size.setdefault(tuple(size), []).append(path)
+    rendered = {}
+    for size in sorted(by_size, key=lambda s: s[0] * s[1], reverse=True):
+        if current.size != size:
+            current = current.resize(size, Image.Resampling.LANCZOS)
+        rendered[size] = current
+
+    # Identical (size, format) outputs are encoded once and written to every path
+    jobs = {}
+    for size, paths in by_size.items():
+        for path in paths:
+            if path in stale:
+                jobs.setdefault((size, os.path.splitext(path)[1].lower()), []).append(path)
+
+    def write(item):
+        (size, ext), paths = item
+        start = time.perf_counter()
+        data = encode(rendered[size], ext)
+        for path in paths:
+            full_path = os.path.join(ROOT, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'wb') as f:
+                f.write(data)
+        seconds = time.perf_counter() - start
+        return [(path, seconds / len(paths)) for path in paths]
+
+    with ThreadPoolExecutor() as threads:
+        return [result for results in threads.map(write, jobs.items()) for result in results]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate launcher icon and splash densities from master images.')
+    parser.add_argument('--force', action='store_true', help='regenerate every output')
+    parser.add_argument('--dry-run', action='store_true', help='list out-of-date outputs without writing')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU core)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    state = load_state()
+    manifest = build_manifest()
+    work, keys, skipped = [], {}, 0
+    for master, targets in manifest.items():
+        digest = file_digest(os.path.join(ROOT, master))
+        stale = set()
+        for path, size in targets:
+            keys[path] = target_key(digest, size, path)
+            if args.force or not is_up_to_date(state, path, keys[path]):
+                stale.add(path)
+            else:
+                skipped += 1
+        if stale:
+            work.append((master, targets, stale))
+
+    if args.dry_run:
+        for master, _, stale in work:
+            for path in sorted(stale):
+                print(f'  out of date: {path}  (from {master})')
+        print(f'\n  {sum(len(stale) for _, _, stale in work)} to generate, {skipped} up to date')
+        return
+
+    written = 0
+    if work:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for results in pool.map(render_master, work):
+                for path, seconds in results:
+                    state[path] = {'key': keys[path], 'digest': file_digest(os.path.join(ROOT, path))}
+                    print(f'  {seconds * 1000:7.1f} ms  {path}')
+                    written += 1
+        save_state(state)
+
+    print(f'\n  {written} generated, {skipped} up to date in {time.perf_counter() - start:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
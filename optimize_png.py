@@ -0,0 +1,256 @@
+"""
+PNG Asset Optimizer
+Shrinks the PNGs shipped in the Flutter bundle and embedded in the PDFs
+Broader AI
+
+Every file is re-encoded losslessly at maximum deflate effort, reduced to
+the smallest mode that holds its pixels exactly (RGBA -> RGB when fully
+opaque, RGB -> L for grey images, any image with 256 colours or fewer ->
+palette) and stripped of metadata chunks. With --quantize, images that do
+not fit a palette exactly are quantized to 256 colours as long as the
+result stays above a PSNR quality floor. A file is only rewritten when the
+result is smaller and decodes back to the same pixels (or, quantized, to
+pixels above the quality floor). PNGs with more than 8 bits per channel are
+left alone: Pillow decodes them to 8 bits, so no re-encoding is lossless.
+
+Usage:
+    python optimize_png.py assets/images assets/screenshots web/icons
+    python optimize_png.py assets/screenshots --quantize --min-psnr 42
+    python optimize_png.py "assets/**/*.png" --dry-run
+"""
+
+from PIL import Image
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import argparse
+import glob
+import os
+import time
+
+from asset_cache import CACHE_ROOT, ContentCache, cache_key, file_digest
+
+CACHE_NAME = 'optimize_png'
+# Bump whenever the encoder settings below change
+CACHE_VERSION = 2
+
+MIN_PSNR = 40.0
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def collect_pngs(targets):
+    found = set()
+    for target in targets:
+        if os.path.isdir(target):
+            matches = glob.glob(os.path.join(target, '**', '*.png'), recursive=True)
+        else:
+            matches = glob.glob(target, recursive=True)
+        found.update(os.path.normpath(path) for path in matches
+                     if os.path.isfile(path) and path.lower().endswith('.png'))
+    return sorted(found)
+
+
+def png_bit_depth(path):
+    """Bits per channel (or palette index) from the IHDR chunk, without decoding; None if not a PNG"""
+    with open(path, 'rb') as f:
+        header = f.read(25)
+    if len(header) < 25 or not header.startswith(PNG_SIGNATURE) or header[12:16] != b'IHDR':
+        return None
+    return header[24]
+
+
+def decode_rgba(data):
+    """RGBA pixels of encoded PNG bytes"""
+    with Image.open(BytesIO(data)) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def psnr(original, candidate):
+    """Peak signal-to-noise ratio in dB between two same-sized uint8 arrays"""
+    error = np.mean((original.astype(np.float32) - candidate.astype(np.float32)) ** 2)
+    if error == 0:
+        return float('inf')
+    return 10 * np.log10(255.0 ** 2 / error)
+
+
+def exact_palette(pixels, opaque):
+    """P-mode image holding exactly the colours of an RGBA array (caller checks there are <= 256)"""
+    packed = pixels.view(np.uint32).reshape(pixels.shape[:2])
+    colours, indices = np.unique(packed, return_inverse=True)
+    entries = colours.view(np.uint8).reshape(-1, 4)
+    img = Image.fromarray(indices.reshape(packed.shape).astype(np.uint8), 'P')
+    img.putpalette(entries[:, :3].tobytes())
+    if not opaque:
+        img.info['transparency'] = entries[:, 3].tobytes()
+    return img
+
+
+def lossless_reduce(img):
+    """Smallest of RGBA/RGB/LA/L/P that reproduces every pixel exactly"""
+    pixels = np.ascontiguousarray(np.asarray(img.convert('RGBA')))
+    opaque = bool((pixels[..., 3] == 255).all())
+    grey = bool(((pixels[..., 0] == pixels[..., 1]) & (pixels[..., 1] == pixels[..., 2])).all())
+    if grey:
+        return Image.fromarray(pixels[..., 0] if opaque else np.ascontiguousarray(pixels[..., [0, 3]]),
+                               'L' if opaque else 'LA')
+    if len(np.unique(pixels.view(np.uint32))) <= 256:
+        return exact_palette(pixels, opaque)
+    if opaque:
+        return Image.fromarray(np.ascontiguousarray(pixels[..., :3]), 'RGB')
+    return Image.fromarray(pixels, 'RGBA')
+
+
+def quantize(img, min_psnr=MIN_PSNR):
+    """(256-colour palette image or None if below min_psnr, its PSNR in dB)"""
+    rgba = img.convert('RGBA')
+    palette = rgba.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.FLOYDSTEINBERG)
+    quality = psnr(np.asarray(rgba), np.asarray(palette.convert('RGBA')))
+    return (palette, quality) if quality >= min_psnr else (None, quality)
+
+
+def encode(img):
+    """PNG bytes at maximum effort with no metadata chunks.
+
+    Palette transparency is the only ancillary data carried over.
+    """
+    out = BytesIO()
+    params = {'optimize': True}
+    if img.mode == 'P' and 'transparency' in img.info:
+        params['transparency'] = img.info['transparency']
+    img.save(out, 'PNG', **params)
+    return out.getvalue()
+
+
+def optimize_bytes(path, quantize_colors=False, min_psnr=MIN_PSNR):
+    """Best encoding of the 8-bit PNG at path; returns (bytes, note), bytes None if it failed to verify"""
+    with Image.open(path) as source:
+        source.load()
+        pixels = np.asarray(source.convert('RGBA'))
+        reduced = lossless_reduce(source)
+        best, note = encode(reduced), f'lossless {reduced.mode}'
+        # Checked on the decoded bytes, so nothing lost in encoding goes unnoticed
+        if not np.array_equal(decode_rgba(best), pixels):
+            return None, f'lossless {reduced.mode} changed pixels, kept original'
+        if quantize_colors and reduced.mode != 'P':
+            palette, quality = quantize(source, min_psnr)
+            if palette is not None:
+                candidate = encode(palette)
+                quality = psnr(pixels, decode_rgba(candidate))
+                if quality < min_psnr:
+                    note += f' (quantize rejected, {quality:.1f} dB decoded)'
+                elif len(candidate) < len(best):
+                    best, note = candidate, f'quantized {quality:.1f} dB'
+            else:
+                note += f' (quantize rejected, {quality:.1f} dB)'
+    return best, note
+
+
+def _optimize_file(job):
+    path = job[0]
+    start = time.perf_counter()
+    try:
+        return _optimize(*job, start)
+    except Exception as error:
+        # One unreadable file is reported without stopping the batch
+        size = os.path.getsize(path) if os.path.isfile(path) else 0
+        return path, size, size, f'failed, {type(error).__name__}: {error}', time.perf_counter() - start
+
+
+def _optimize(path, options, cache_root, dry_run, start):
+    before = os.path.getsize(path)
+    depth = png_bit_depth(path)
+    if depth is None:
+        return path, before, before, 'skipped, not a PNG', time.perf_counter() - start
+    if depth > 8:
+        return path, before, before, f'skipped, {depth}-bit', time.perf_counter() - start
+    params = (CACHE_NAME, CACHE_VERSION, options)
+    data = None
+    if cache_root:
+        cache = ContentCache(CACHE_NAME, cache_root)
+        digest = file_digest(path)
+        key = cache_key(*params, digest)
+        cached = cache.load(key)
+        if cached is not None:
+            data, note = cached, 'cached'
+    if data is None:
+        data, note = optimize_bytes(path, **options)
+        if cache_root and data is not None:
+            cache.store(key, data)
+    if data is None:
+        after = before
+    elif len(data) >= before:
+        after, note = before, f'already optimal, best was {note}'
+        data = None
+    else:
+        after = len(data)
+        if not dry_run:
+            with open(path, 'wb') as f:
+                f.write(data)
+    if cache_root and data is not None and not dry_run:
+        # The rewritten file maps to itself, so the next run is a cheap hit
+        cache.store(cache_key(*params, file_digest(path)), data)
+    return path, before, after, note, time.perf_counter() - start
+
+
+def optimize_pngs(paths, options=None, jobs=None, cache_root=CACHE_ROOT, dry_run=False):
+    """Optimize on a process pool, yielding (path, bytes before, bytes after, note, seconds)"""
+    paths = sorted(paths, key=os.path.getsize, reverse=True)
+    work = [(path, options or {}, cache_root, dry_run) for path in paths]
+    if jobs == 1 or len(work) <= 1:
+        for job in work:
+            yield _optimize_file(job)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_optimize_file, work, chunksize=1)
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Losslessly recompress PNG assets.')
+    parser.add_argument('targets', nargs='+', help='PNG files, directories or glob patterns')
+    parser.add_argument('--quantize', action='store_true',
+                        help='allow 256-colour palette quantization when it keeps quality above --min-psnr')
+    parser.add_argument('--min-psnr', type=float, default=MIN_PSNR,
+                        help='quality floor for --quantize in dB (default: %(default)s)')
+    parser.add_argument('--dry-run', action='store_true', help='report savings without rewriting files')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU core)')
+    parser.add_argument('--cache-dir', default=CACHE_ROOT,
+                        help='result cache location (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='always re-encode')
+    args = parser.parse_args(argv)
+
+    paths = collect_pngs(args.targets)
+    if not paths:
+        print('No PNG files found.')
+        return
+
+    options = {'quantize_colors': args.quantize, 'min_psnr': args.min_psnr}
+    cache_root = None if args.no_cache else args.cache_dir
+    total_before = total_after = failed = 0
+    start = time.perf_counter()
+    for path, before, after, note, seconds in optimize_pngs(paths, options, args.jobs, cache_root, args.dry_run):
+        failed += note.startswith('failed')
+        total_before += before
+        total_after += after
+        saved = (before - after) / before * 100 if before else 0
+        print(f'  {format_bytes(before):>9} -> {format_bytes(after):>9}  {saved:5.1f}%  '
+              f'{seconds * 1000:7.0f} ms  {path}  [{note}]')
+
+    saved = total_before - total_after
+    print(f'\n  {len(paths)} files: {format_bytes(total_before)} -> {format_bytes(total_after)}, '
+          f'saved {format_bytes(saved)} ({saved / total_before * 100 if total_before else 0:.1f}%) '
+          f'in {time.perf_counter() - start:.2f} s' + (' (dry run)' if args.dry_run else ''))
+    if failed:
+        print(f'  {failed} file{"s" if failed > 1 else ""} could not be optimized, see [failed] above')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,442 @@
+"""
+Shared FPDF base for the MODI documentation generators
+Broader AI
+
+ProfessionalDocPDF (create_professional_pdf.py) and ModiDocumentationPDF
+(create_documentation_pdf.py) both derive from DocumentPDF.
+"""
+
+from fpdf import FPDF
+from fpdf.enums import Align, PDFResourceType, WrapMode, XPos, YPos
+from fpdf.image_datastructures import RasterImageInfo
+from fpdf.line_break import Fragment, MultiLineBreak, TextLine
+from fpdf.outline import OutlineSection
+from fpdf.syntax import DestinationXYZ, Name, PDFArray, PDFContentStream
+from fpdf.util import Padding
+from contextlib import nullcontext
+from functools import partial, wraps
+from io import BytesIO
+from itertools import chain, islice
+import os
+
+from asset_cache import CACHE_ROOT, ContentCache
+from pdf_images import CACHE_NAME as IMAGE_CACHE_NAME, PLACEHOLDER_COLOR, TARGET_DPI, ImageRegistry, placed_size
+from pdf_stream import OutputFile, PageSpill, StreamingOutputProducer
+from pdf_text import CACHE_NAME as LINE_CACHE_NAME, LineBreakCache
+
+MM_PER_POINT = 25.4 / 72
+# Rows measured to size the columns of a stream_table()
+TABLE_SAMPLE_ROWS = 200
+
+
+class TemplateResources:
+    """Builds a recorded template's /Resources once the document's objects exist.
+
+    fpdf fills in the resources of the Form XObjects in its resource catalog
+    through their _blend_group attribute, so an instance is attached there.
+    """
+
+    def __init__(self, resources):
+        self.resources = resources
+
+    def get_resource_dictionary(self, gfxstate_objs_per_name, pattern_objs_per_name,
+                                shading_objs_per_name, font_objs_per_index, img_objs_per_index):
+        used = {}
+        for resource_type, name in self.resources:
+            used.setdefault(resource_type, set()).add(name)
+        parts = []
+        for resource_type, prefix, objects, key in (
+                (PDFResourceType.FONT, 'F', font_objs_per_index, int),
+                (PDFResourceType.X_OBJECT, 'I', img_objs_per_index, int),
+                (PDFResourceType.EXT_G_STATE, '', gfxstate_objs_per_name, str),
+                (PDFResourceType.PATTERN, '', pattern_objs_per_name, str)):
+            names = sorted(used.get(resource_type, ()))
+            if names:
+                entries = ''.join(f'{Name(prefix + name).serialize()} {objects[key(name)].id} 0 R' for name in names)
+                parts.append(f'{Name(resource_type.value).serialize()}<<{entries}>>')
+        return '<<' + ''.join(parts) + '>>'
+
+
+class DocumentPDF(FPDF):
+    def __init__(self, image_dpi=TARGET_DPI, jpeg_quality=None, image_jobs=None, cache_root=CACHE_ROOT,
+                 name=None, draft=False, spill=False):
+        super().__init__()
+        # Images are resampled to image_dpi for their placed size;
+        # jpeg_quality (e.g. 85) re-encodes photographic ones as JPEG;
+        # image_jobs=1 encodes them inline instead of on a process pool;
+        # cache_root=None disables the persistent image stream and line caches;
+        # name keys the line cache (the class name unless given);
+        # draft=True draws placeholders for images and leaves streams uncompressed;
+        # spill=True moves finished pages to a temporary file (see pdf_stream)
+        cache = ContentCache(IMAGE_CACHE_NAME, cache_root) if cache_root else None
+        self.images = ImageRegistry(self.image_cache, image_dpi, jpeg_quality, image_jobs, cache)
+        cache = ContentCache(LINE_CACHE_NAME, cache_root) if cache_root else None
+        self.line_breaks = LineBreakCache(name or type(self).__name__, cache)
+        self.templates = {}
+        # part: this document is a part laid out in a worker process;
+        # parts_from: first page of the main document laid over by a part
+        self.part = False
+        self.parts_from = None
+        self._toc_page = None
+        # Files whose presence or content the layout so far depends on
+        self.assets = set()
+        # partial: only some sections are laid out, so the line cache keeps
+        # the paragraphs this build did not use
+        self.partial = False
+        self.draft = draft
+        if draft:
+            self.set_compression(False)
+        self.spill = PageSpill() if spill else None
+
+    def asset_exists(self, path):
+        """os.path.exists(), recording path as an asset of the document.
+
+        Together with the files placed with image(), the assets let a cached
+        part (see pdf_parallel) be checked against what it was laid out from.
+        """
+        self.assets.add(path)
+        return os.path.exists(path)
+
+    def image(self, name, x=None, y=None, w=0, h=0, *args, **kwargs):
+        """FPDF.image(), with local raster files resolved through the image registry.
+
+        The registry resamples the image for its placed size, encodes it on
+        a process pool while layout goes on (or takes it from the stream
+        cache in .cache/pdf_images) and embeds it once however many file
+        names hold the same content.
+        """
+        if (isinstance(name, str) and not name.lower().endswith('.svg')
+                and not name.startswith(('http://', 'https://', 'data:'))
+                and not args and not kwargs.get('dims') and not kwargs.get('keep_aspect_ratio')):
+            if self.draft and not isinstance(x, Align):
+                return self._image_placeholder(name, x, y, w, h)
+            name = self.images.resolve(name, w * self.k * MM_PER_POINT, h * self.k * MM_PER_POINT)
+        return super().image(name, x, y, w, h, *args, **kwargs)
+
+    def _image_placeholder(self, name, x, y, w, h):
+        """Draw a box where FPDF.image() would place name, reading only the image's header"""
+        size = placed_size(name, w * self.k * MM_PER_POINT, h * self.k * MM_PER_POINT, self.images.dpi)
+        info = RasterImageInfo(w=size[0], h=size[1])
+        w, h = info.size_in_document_units(w, h, scale=self.k)
+        # Same flowing mode as FPDF._raster_image()
+        if y is None:
+            self._perform_page_break_if_need_be(h)
+            y = self.y
+            self.y += h
+        if x is None:
+            x = self.x
+        fill = ' '.join(f'{channel / 255:.3f}' for channel in PLACEHOLDER_COLOR)
+        self._out(f'q {fill} rg 0.8 G 0.2 w {x * self.k:.2f} {(self.h - y) * self.k:.2f} '
+                  f'{w * self.k:.2f} {-h * self.k:.2f} re B Q')
+        info['rendered_width'] = w
+        info['rendered_height'] = h
+        return info
+
+    def template(self, name, draw, stamp=True):
+        """Stamp the fixed fragment drawn by draw(), recording it as a Form XObject on first use.
+
+        Every call, the first included, draws the fragment with a single Do
+        operator, so header bars and footer bands are stored once; only what
+        changes per page, such as the page number, is drawn live.
+
+        draw() must place everything at absolute page positions. The cursor
+        is left where draw() left it; colours, font and line width are left
+        as they were before the call. stamp=False only moves the cursor.
+        """
+        if name not in self.templates:
+            self.templates[name] = self._record_template(draw)
+        index, x, y = self.templates[name]
+        if stamp:
+            self._out(f'/I{index} Do')
+            self._resource_catalog.add(PDFResourceType.X_OBJECT, index, self.page)
+        self.x, self.y = x, y
+
+    def _record_template(self, draw):
+        page = self.pages[self.page]
+        start = len(page.contents)
+        with self.local_context():
+            # Open with the current state so the form does not depend on
+            # whatever page it happens to be stamped on
+            self._out(self.fill_color.serialize().lower())
+            self._out(self.draw_color.serialize())
+            self._out(f'{self.line_width * self.k:.2f} w')
+            self.current_font_is_set_on_page = False
+            draw()
+            x, y = self.x, self.y
+        stream = bytes(page.contents[start:])
+        page.contents = page.contents[:start]
+
+        xobject = PDFContentStream(contents=stream, compress=self.compress)
+        xobject.type = Name('XObject')
+        xobject.subtype = Name('Form')
+        xobject.b_box = PDFArray([0, 0, round(self.w_pt, 2), round(self.h_pt, 2)])
+        xobject._blend_group = TemplateResources(
+            self._resource_catalog.scan_stream(stream.decode('latin-1')))
+        xobject._registered = False
+        # Form XObjects share the /In namespace with images, so the index is
+        # reserved with an unused entry in the image cache
+        index = len(self.image_cache.images) + 1
+        self.image_cache.images[f'template-{index}'] = RasterImageInfo(i=index, usages=0, w=0, h=0)
+        self._resource_catalog.form_xobjects.append((index, xobject))
+        return index, x, y
+
+    def stream_table(self, headers, rows, col_widths=None, header_fill=(99, 102, 241),
+                     header_text=(255, 255, 255), stripe_fill=(240, 240, 250), text_color=(50, 50, 50),
+                     font_size=9, header_height=8, row_height=7, sample_rows=TABLE_SAMPLE_ROWS):
+        """Render a bordered, striped, centred table from an iterable of rows; returns the row count.
+
+        Only the first sample_rows rows are held in memory, so a ledger with
+        tens of thousands of rows is never materialised, and each row is
+        written as one block of operators. Without col_widths, the columns
+        share the page width in proportion to the widest header or value of
+        the sample; text too wide for its column is cut short with '...'.
+        The header is repeated after every page break.
+        """
+        rows = iter(rows)
+        sample = [[str(value) for value in row] for row in islice(rows, sample_rows)]
+        self.set_font('Helvetica', 'B', font_size)
+        header_font = self.current_font
+        self.set_font('Helvetica', '', font_size)
+        body_font = self.current_font
+        if col_widths is None:
+            col_widths = self._table_widths(headers, sample, header_font, body_font, font_size)
+        x = self.l_margin
+        fills = ((255, 255, 255), stripe_fill)
+
+        # Never leave the header alone at the foot of a page
+        if self.y + header_height + row_height > self.page_break_trigger and self.auto_page_break:
+            self.add_page(same=True)
+        self._table_row(headers, x, col_widths, header_height, header_font, font_size, header_fill, header_text)
+        count = 0
+        for row in chain(sample, rows):
+            if self.y + row_height > self.page_break_trigger and self.auto_page_break:
+                self.add_page(same=True)
+                self._table_row(headers, x, col_widths, header_height, header_font, font_size,
+                                header_fill, header_text)
+            self._table_row(row, x, col_widths, row_height, body_font, font_size,
+                            fills[count % 2], text_color)
+            count += 1
+
+        # Leave the state the row-by-row cell() version left behind
+        self.set_text_color(*text_color)
+        self.set_fill_color(*fills[(count - 1) % 2] if count else header_fill)
+        self.x = x
+        return count
+
+    def _table_widths(self, headers, sample, header_font, body_font, font_size):
+        natural = []
+        for i, header in enumerate(headers):
+            widths = [header_font.get_text_width(self.normalize_text(header), font_size, None)[1]]
+            widths += [body_font.get_text_width(self.normalize_text(row[i]), font_size, None)[1]
+                       for row in sample if i < len(row)]
+            natural.append(max(widths) / self.k + 2 * self.c_margin)
+        scale = self.epw / sum(natural)
+        return [width * scale for width in natural]
+
+    def _fit(self, text, font, font_size, width):
+        """text, cut short with '...' when wider than width"""
+        if font.get_text_width(text, font_size, None)[1] / self.k <= width:
+            return text
+        while text and font.get_text_width(text + '...', font_size, None)[1] / self.k > width:
+            text = text[:-1]
+        return text + '...'
+
+    def _table_row(self, values, x, col_widths, height, font, font_size, fill, text_color):
+        """One row of bordered, filled, centred cells as a single q ... Q block"""
+        k = self.k
+        top = (self.h - self.y) * k
+        baseline = (self.h - self.y - 0.5 * height - 0.3 * font_size / k) * k
+        # Text is painted with the non-stroking colour too, so fill and text
+        # colours are set inside q/Q and the page state is left untouched
+        cells, texts = [], []
+        for width, value in zip(col_widths, values):
+            cells.append(f'{x * k:.2f} {top:.2f} {width * k:.2f} {-height * k:.2f} re B')
+            text = self._fit(self.normalize_text(str(value)), font, font_size, width - 2 * self.c_margin)
+            if text:
+                text_width = font.get_text_width(text, font_size, None)[1]
+                texts.append(f'BT {x * k + (width * k - text_width) / 2:.2f} {baseline:.2f} Td '
+                             f'{font.encode_text(text)} ET')
+            x += width
+        self._resource_catalog.add(PDFResourceType.FONT, font.i, self.page)
+        self._out(f'q {fill[0] / 255:.4f} {fill[1] / 255:.4f} {fill[2] / 255:.4f} rg {self.line_width * k:.2f} w\n'
+                  + '\n'.join(cells)
+                  + f'\n{text_color[0] / 255:.4f} {text_color[1] / 255:.4f} {text_color[2] / 255:.4f} rg '
+                  + f'BT /F{font.i} {font_size:.2f} Tf ET\n'
+                  + '\n'.join(texts) + '\nQ')
+        self.y += height
+
+    def multi_cell(self, w, h=None, text='', border=0, align=Align.J, fill=False, *args,
+                   new_x=XPos.RIGHT, new_y=YPos.NEXT, **kwargs):
+        """FPDF.multi_cell(), with the lines of plain paragraphs taken from the line break cache
+
+        A paragraph is broken into lines once; the LineBreakCache is saved
+        with the document, so a repeated paragraph, in this build or the
+        next, is drawn without being measured again.
+
+        Calls that use anything beyond text, alignment and the new_x/new_y
+        cursor moves (borders, fill, markdown, padding, dry runs, the {nb}
+        alias, text shaping, soft hyphens) go through fpdf unchanged.
+        """
+        if (args or kwargs or border or fill or align in ('X', Align.X) or not self.page or not self.font_family
+                or self.text_shaping or self._fallback_font_ids
+                or (self.str_alias_nb_pages and self.str_alias_nb_pages in text) or '\u00ad' in text):
+            return super().multi_cell(w, h, text, border, align, fill, *args, new_x=new_x, new_y=new_y, **kwargs)
+        align, new_x, new_y = Align.coerce(align), XPos.coerce(new_x), YPos.coerce(new_y)
+        if h is None:
+            h = self.font_size
+        if w == 0:
+            w = self.w - self.r_margin - self.x
+        key = (text, self.font_family, self.font_style, self.font_size_pt, self.char_spacing,
+               self.font_stretching, round(w, 6), self.c_margin, align.value)
+        lines = self.line_breaks.get(key, lambda: self._break_lines(text, w, align))
+
+        state = self._get_current_graphics_state()
+        text_lines = [TextLine([Fragment(chars, state, self.k) for chars in fragments], *fields)
+                      for fragments, *fields in lines]
+        if not text_lines:
+            text_lines = [TextLine([], text_width=0, number_of_spaces=0, align=align, height=h,
+                                   max_width=w, trailing_nl=False)]
+        # The render loop of FPDF.multi_cell() without padding or a box
+        prev_y = self.y
+        page_break_triggered = False
+        for index, text_line in enumerate(text_lines):
+            if self._perform_page_break_if_need_be(h):
+                page_break_triggered = True
+            is_last_line = index == len(text_lines) - 1
+            self._render_styled_text_line(
+                text_line, h=h,
+                new_x=new_x if is_last_line else XPos.LEFT,
+                new_y=new_y if is_last_line else YPos.NEXT,
+                border=0, fill=False, padding=Padding(0, 0, 0, 0))
+        if text_lines[-1].trailing_nl and new_y in (YPos.LAST, YPos.NEXT):
+            self.ln()
+        if new_y == YPos.TOP and not page_break_triggered:
+            self.y = prev_y
+        return page_break_triggered
+
+    def _break_lines(self, text, w, align):
+        """Lines of text broken as FPDF.multi_cell() would, as picklable tuples"""
+        fragments = self._preload_font_styles(self.normalize_text(text).replace('\r', ''), False)
+        line_break = MultiLineBreak(fragments, w, [self.c_margin, self.c_margin], align=align,
+                                    print_sh=False, wrapmode=WrapMode.WORD)
+        lines = []
+        while (text_line := line_break.get_line()) is not None:
+            lines.append((tuple(''.join(fragment.characters) for fragment in text_line.fragments),
+                          *text_line[1:]))
+        return tuple(lines)
+
+    def heading(self, name, level, h):
+        """Record the heading of height h about to be drawn as an outline bookmark and TOC entry"""
+        # Take the page break the heading's cell() would take first, so the
+        # entry points at the page the heading actually lands on
+        self._perform_page_break_if_need_be(h)
+        self.start_section(name, level, strict=False)
+
+    def insert_toc(self, render_entry, pages=1, levels=1):
+        """Reserve pages for a table of contents written at output(); the cursor moves past them.
+
+        The entries come from the headings recorded with heading() and the
+        pages they landed on, so the document is laid out once and still
+        gets the real page numbers.
+
+        render_entry(section) draws the entry of one recorded heading, an
+        fpdf OutlineSection with name, level and page_number, at the
+        cursor. Headings at level >= levels are bookmarks only. The entries
+        must fit in pages pages, the current one included; pages they leave
+        over (in a build of only some sections) stay blank.
+        """
+        self.insert_toc_placeholder(lambda pdf, outline: self._render_toc(outline, render_entry, levels), pages)
+        # Where the body starts below the header, which the reserved pages
+        # already carry by the time the entries are written
+        self.toc_top = self.y
+        # The placeholder leaves a new page open; the next add_page() takes it
+        self._toc_page = (self.page, len(self.pages[self.page].contents))
+
+    @wraps(FPDF.add_page)
+    def add_page(self, *args, **kwargs):
+        toc_page, self._toc_page = self._toc_page, None
+        if toc_page is not None and toc_page == (self.page, len(self.pages[self.page].contents)):
+            return
+        page = self.page
+        super().add_page(*args, **kwargs)
+        if self.spill and page and self.page != page:
+            self._spill_page(page)
+
+    def _spill_page(self, index):
+        """Move the content of a finished page to the spill file, unless output() still draws on it"""
+        page = self.pages[index]
+        toc = self.toc_placeholder
+        if (self.in_toc_rendering or self._security_handler or page.get_text_substitutions()
+                or toc and toc.start_page <= index < toc.start_page + toc.pages):
+            return
+        self.spill.add(index, page.contents, self.compress)
+        page.contents = bytearray()
+
+    def is_part_page(self):
+        return self.parts_from is not None and self.page >= self.parts_from
+
+    def add_part_pages(self, pages, headings):
+        """Add the pages a part laid out elsewhere will be merged onto; returns the first one.
+
+        A part (see pdf_parallel) is a document of its own with part set,
+        which moves the cursor past the page header without drawing it. The
+        pages added here carry the header and the real page number, and the
+        part's pages are laid over them when merging.
+
+        headings are the part's (name, level, page, top) outline entries,
+        with the part's own page numbers; they are recorded on the pages
+        added here, for the outline and the table of contents.
+        """
+        self.add_page()
+        if self.parts_from is None:
+            self.parts_from = self.page
+        first = self.page
+        for _ in range(pages - 1):
+            self.add_page()
+        for name, level, page, top in headings:
+            page += first - 1
+            self._outline.append(OutlineSection(name, level, page, DestinationXYZ(page, top=top)))
+        return first
+
+    def _render_toc(self, outline, render_entry, levels):
+        t_margin, self.t_margin = self.t_margin, self.toc_top
+        try:
+            for section in outline:
+                if section.level < levels:
+                    render_entry(section)
+            placeholder = self.toc_placeholder
+            self.page = max(self.page, placeholder.start_page + placeholder.pages - 1)
+        finally:
+            self.t_margin = t_margin
+
+    def output(self, name='', **kwargs):
+        """FPDF.output(), once the image encodes are done and the line break cache is saved.
+
+        With spill=True, finished pages have already been moved to a
+        temporary file, and the file is written object by object as it is
+        serialized instead of being built in memory first (see pdf_stream);
+        no other output option (linearize, output_producer_class) can be
+        combined with it.
+        """
+        if self.spill and kwargs:
+            raise ValueError(f'output() with spill=True takes no {", ".join(sorted(kwargs))}')
+        self.images.finish()
+        self.line_breaks.save(prune=not self.partial)
+        if not self.spill:
+            return super().output(name, **kwargs)
+        if not name:
+            target = BytesIO()
+        elif isinstance(name, (str, os.PathLike)):
+            target = open(name, 'wb')
+        else:
+            target = nullcontext(name)
+        with target as f:
+            super().output(output_producer_class=partial(StreamingOutputProducer, file=f, spill=self.spill))
+            data = None if name else bytearray(f.getvalue())
+        self.spill.close()
+        return data
+
+    def _default_file_id(self, buffer):
+        if isinstance(buffer, OutputFile):
+            return buffer.file_id(self.creation_date)
+        return super()._default_file_id(buffer)
@@ -0,0 +1,226 @@
+"""
+PDF Image Preparation
+Resamples and re-encodes raster images before they are embedded by fpdf
+Broader AI
+"""
+
+from PIL import Image
+import numpy as np
+import fpdf
+from fpdf.image_datastructures import RasterImageInfo
+from fpdf.image_parsing import get_img_info
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import pickle
+
+from asset_cache import cache_key, file_digest
+
+CACHE_NAME = 'pdf_images'
+# Bump whenever prepare_image() changes its output
+CACHE_VERSION = 1
+
+MM_PER_INCH = 25.4
+TARGET_DPI = 150
+JPEG_QUALITY = 85
+# Share of distinct colours above which an image is treated as a photo;
+# UI screenshots stay well under 5% because of their flat fills
+PHOTO_COLOR_RATIO = 0.2
+PLACEHOLDER_COLOR = (241, 245, 249)
+
+
+def target_size(size, width_mm, height_mm=0, dpi=TARGET_DPI):
+    """Pixel size that gives at least dpi over the placed box, keeping the aspect ratio.
+
+    A width or height of 0 follows from the other dimension, as in
+    FPDF.image(). Images already at or below the target, or placed without
+    any explicit size, are left at their own size.
+    """
+    width, height = size
+    scale = max(width_mm / MM_PER_INCH * dpi / width, height_mm / MM_PER_INCH * dpi / height)
+    if scale >= 1 or scale == 0:
+        return size
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def placed_size(path, width_mm, height_mm=0, dpi=TARGET_DPI):
+    """target_size() of the image at path, reading only its header"""
+    with Image.open(path) as img:
+        return target_size(img.size, width_mm, height_mm, dpi)
+
+
+def is_opaque(img):
+    if img.mode in ('RGBA', 'LA', 'PA'):
+        return img.getchannel('A').getextrema()[0] == 255
+    return 'transparency' not in img.info
+
+
+def is_photographic(img):
+    """True when the image has too many distinct colours to be a flat UI graphic"""
+    pixels = np.asarray(img.convert('RGB'))
+    packed = (pixels[..., 0].astype(np.uint32) << 16) | (pixels[..., 1].astype(np.uint32) << 8) | pixels[..., 2]
+    return len(np.unique(packed)) > PHOTO_COLOR_RATIO * packed.size
+
+
+def prepare_image(path, width_mm, height_mm=0, dpi=TARGET_DPI, jpeg_quality=None):
+    """Image ready for FPDF.image(): a PIL image, or JPEG bytes in a BytesIO.
+
+    fpdf would embed the file at its full pixel size, with an SMask even
+    when the alpha is 255 everywhere. Here the image is resampled to dpi
+    for the size it is placed at (never upscaled) and loses its alpha
+    channel when fully opaque. jpeg_quality enables JPEG re-encoding for opaque photographic images;
+    None keeps every image lossless.
+    """
+    with Image.open(path) as source:
+        source.load()
+        opaque = is_opaque(source)
+        if source.mode in ('1', 'L', 'RGB') and opaque:
+            img = source.copy()
+        elif opaque:
+            img = source.convert('L' if source.mode in ('LA', 'I', 'I;16') else 'RGB')
+        else:
+            img = source.convert('LA' if source.mode in ('L', 'LA') else 'RGBA')
+
+    size = target_size(img.size, width_mm, height_mm, dpi)
+    if size != img.size:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+
+    if jpeg_quality is not None and opaque and is_photographic(img):
+        out = BytesIO()
+        img.convert('RGB').save(out, 'JPEG', quality=jpeg_quality, optimize=True)
+        out.seek(0)
+        return out
+    return img
+
+
+def encode_image(job):
+    """Prepare and encode one image; returns fpdf's image info as a plain dict.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    path, width_mm, height_mm, dpi, jpeg_quality, image_filter = job
+    prepared = prepare_image(path, width_mm, height_mm, dpi, jpeg_quality)
+    return dict(get_img_info(path, prepared, image_filter))
+
+
+class ImageRegistry:
+    """Content-addressed index from image files to the XObjects of one document.
+
+    fpdf keys its image cache by file name; the registry keys every
+    placement by the SHA-256 of the file plus the prepared pixel size, so
+    identical files under different names are embedded once.
+
+    Images are encoded on a process pool while layout carries on: the first
+    placement of an image submits it and installs a placeholder entry in
+    fpdf's image cache holding only the pixel size, which is all layout
+    needs. finish() attaches the encoded streams before output. jobs=1
+    encodes inline instead. With a ContentCache, encoded streams found there
+    are attached straight away and new ones are stored by finish().
+    """
+
+    def __init__(self, image_cache, dpi=TARGET_DPI, jpeg_quality=None, jobs=None, cache=None):
+        self.image_cache = image_cache
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+        self.jobs = jobs
+        self.cache = cache
+        self.pool = None
+        self.pending = {}
+        self.digests = {}
+        self.keys = {}
+        self.paths = {}
+        self.placements = 0
+
+    def digest(self, path):
+        if path not in self.digests:
+            self.digests[path] = file_digest(path)
+        return self.digests[path]
+
+    def key(self, path, width_mm, height_mm=0):
+        """(content key, prepared pixel size) of path as placed in a width_mm x height_mm box"""
+        placement = (path, width_mm, height_mm)
+        if placement not in self.keys:
+            size = placed_size(path, width_mm, height_mm, self.dpi)
+            self.keys[placement] = cache_key(self.digest(path), list(size), self.jpeg_quality), size
+        return self.keys[placement]
+
+    def resolve(self, path, width_mm, height_mm=0):
+        """fpdf image cache name holding path, submitting it for encoding on first use"""
+        self.placements += 1
+        key, size = self.key(path, width_mm, height_mm)
+        if key not in self.paths:
+            self.paths[key] = set()
+            images = self.image_cache.images
+            info = RasterImageInfo(w=size[0], h=size[1], i=len(images) + 1, usages=0, iccp_i=None)
+            images[key] = info
+            job = (path, width_mm, height_mm, self.dpi, self.jpeg_quality, self.image_cache.image_filter)
+            cached = self.cache.load(self.cache_key(key)) if self.cache else None
+            if cached is not None:
+                self._attach(info, pickle.loads(cached))
+            elif self.jobs == 1:
+                self._store(key, info, encode_image(job))
+            else:
+                if self.pool is None:
+                    self.pool = ProcessPoolExecutor(max_workers=self.jobs)
+                self.pending[key] = self.pool.submit(encode_image, job)
+        self.paths[key].add(path)
+        return key
+
+    def cache_key(self, key):
+        # fpdf's version is part of the key because the entry is its image info dict
+        return cache_key(CACHE_NAME, CACHE_VERSION, fpdf.__version__, key, self.image_cache.image_filter)
+
+    def _store(self, key, info, encoded):
+        if self.cache:
+            self.cache.store(self.cache_key(key), pickle.dumps(encoded, protocol=pickle.HIGHEST_PROTOCOL))
+        self._attach(info, encoded)
+
+    def _attach(self, info, encoded):
+        info.update({k: v for k, v in encoded.items() if k not in ('i', 'usages', 'iccp_i')})
+        # Same ICC profile bookkeeping as fpdf's preload_image()
+        iccp = info.get('iccp')
+        if iccp is not None:
+            profiles = self.image_cache.icc_profiles
+            if iccp not in profiles:
+                profiles[iccp] = len(profiles)
+            info['iccp_i'] = profiles[iccp]
+            info['iccp'] = None
+
+    def finish(self):
+        """Wait for every submitted image and attach its stream.
+
+        Layout has already placed an image that fails to decode here, so it
+        is replaced by a blank of the same size instead of failing the build.
+        """
+        for key, future in self.pending.items():
+            info = self.image_cache.images[key]
+            try:
+                encoded = future.result()
+            except Exception as error:
+                print(f'  Warning: could not encode {sorted(self.paths[key])[0]}: {error}')
+                blank = Image.new('RGB', (info['w'], info['h']), PLACEHOLDER_COLOR)
+                self._attach(info, dict(get_img_info(key, blank, self.image_cache.image_filter)))
+                continue
+            self._store(key, info, encoded)
+        self.pending.clear()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.cache:
+            self.cache.evict()
+
+    def saved_bytes(self):
+        """Stream bytes not written because several files shared one XObject"""
+        saved = 0
+        for key, paths in self.paths.items():
+            info = self.image_cache.images[key]
+            if len(paths) > 1 and 'data' in info:
+                saved += (len(paths) - 1) * (len(info['data']) + len(info.get('smask') or b''))
+        return saved
+
+    def report(self):
+        duplicates = sum(len(paths) - 1 for paths in self.paths.values())
+        text = (f'{self.placements} placements, {len(self.paths)} embedded, '
+                f'{duplicates} duplicate files shared, {self.saved_bytes() / 1024:.1f} KB saved')
+        if self.cache:
+            text += f'; stream cache: {self.cache.report()}'
+        return text
@@ -0,0 +1,225 @@
+"""
+Parallel PDF Rendering
+Lays the parts of a document out in worker processes and merges them into one PDF
+Broader AI
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from io import BytesIO
+import inspect
+import os
+import pickle
+import sys
+import time
+
+import fpdf
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from asset_cache import CACHE_ROOT, ContentCache, cache_key, file_digest
+
+CACHE_NAME = 'doc_parts'
+# Bump whenever the stored part format, or the way parts are laid out, changes
+CACHE_VERSION = 1
+# Modules whose code shapes every part besides the document class itself
+STYLE_MODULES = ('pdf_base', 'pdf_images', 'pdf_text', 'pdf_spec')
+
+# Laying parts out in parallel only pays off when at least this share of
+# them has to be laid out: merging takes about twice as long as a one-pass
+# build with warm image and line caches
+PARALLEL_MIN_SHARE = 0.5
+
+# XObject name of the main document's page content under a part's page;
+# fpdf only generates /I<n> names
+BASE_FORM = '/MainPage'
+
+
+def asset_digest(path):
+    """Digest of the file at path, or None when there is none"""
+    return file_digest(path) if os.path.isfile(path) else None
+
+
+def render_part(job):
+    """Runs in a worker: lay out one part; returns (PDF bytes, page count, headings, assets, seconds)"""
+    pdf_class, options, part = job
+    start = time.perf_counter()
+    # The worker process is the unit of parallelism, so images are encoded inline
+    pdf = pdf_class(image_jobs=1, name=f'{pdf_class.__name__}.{part.__name__}', **options)
+    pdf.part = True
+    part(pdf)
+    headings = [(section.name, section.level, section.page_number, section.dest.top)
+                for section in pdf._outline]
+    data = bytes(pdf.output())
+    digests = pdf.images.digests
+    assets = sorted((path, digests[path] if path in digests else asset_digest(path))
+                    for path in pdf.assets | digests.keys())
+    return data, pdf.page, headings, assets, time.perf_counter() - start
+
+
+class PartCache:
+    """Laid-out parts kept between builds, each reused while its code, assets and style are unchanged.
+
+    A part is stored in .cache/doc_parts under its source (a function's
+    code, or the JSON of a pdf_spec section) and the style: the document
+    class's source, the shared pdf_* modules and the fpdf version. The
+    entry lists the assets the part checked for or placed, with their
+    digests, and is only reused while all of them are unchanged. Volatile
+    parts (stamped with the build time) are never kept. options are the
+    keyword arguments every document is made with (e.g. jpeg_quality), and
+    are part of the style.
+    """
+
+    def __init__(self, pdf_class, cache_root=CACHE_ROOT, volatile=(), options=None):
+        # cache_root=None keeps nothing, so every part is laid out
+        self.cache = ContentCache(CACHE_NAME, cache_root) if cache_root else None
+        self.volatile = set(volatile)
+        # part -> what load() returned, so each entry is read once per build
+        self.loaded = {}
+        self.options = dict(options or {})
+        style = [file_digest(sys.modules[name].__file__) for name in STYLE_MODULES if name in sys.modules]
+        self.style = cache_key(fpdf.__version__, inspect.getsource(pdf_class), style,
+                               sorted(self.options.items()))
+        self.rendered = []
+
+    def key(self, part):
+        source = getattr(part, 'source', None) or inspect.getsource(part)
+        return cache_key(CACHE_NAME, CACHE_VERSION, self.style, part.__name__, source)
+
+    def load(self, part):
+        """(PDF bytes, page count, headings) of part from an earlier build, or None if it is dirty"""
+        if part not in self.loaded:
+            self.loaded[part] = self._load(part)
+        return self.loaded[part]
+
+    def _load(self, part):
+        if not self.cache or part in self.volatile:
+            return None
+        data = self.cache.load(self.key(part))
+        if data is None:
+            return None
+        rendered, assets = pickle.loads(data)
+        if any(asset_digest(path) != digest for path, digest in assets):
+            return None
+        return rendered
+
+    def store(self, part, data, pages, headings, assets):
+        self.rendered.append(part.__name__)
+        if self.cache and part not in self.volatile:
+            entry = (data, pages, headings), assets
+            self.cache.store(self.key(part), pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def report(self):
+        reused = [part.__name__ for part, rendered in self.loaded.items() if rendered is not None]
+        text = f'reused {len(reused)} ({", ".join(reused) or "none"}), '
+        text += f'laid out {len(self.rendered)} ({", ".join(self.rendered) or "none"})'
+        if self.cache:
+            text += f'; cache: {self.cache.report()}'
+        return text
+
+
+def lay_over(writer, target, page):
+    """Draw page over target, keeping target's page object so links and bookmarks stay valid"""
+    # target's own content becomes a form drawn first, so neither content
+    # stream has to be parsed to rename clashing resources, as
+    # PageObject.merge_page() does
+    form = DecodedStreamObject()
+    form.set_data(target.get_contents().get_data())
+    form.update({
+        NameObject('/Type'): NameObject('/XObject'),
+        NameObject('/Subtype'): NameObject('/Form'),
+        NameObject('/BBox'): target.mediabox,
+        NameObject('/Resources'): target['/Resources'],
+    })
+    resources = page['/Resources'].clone(writer).get_object()
+    xobjects = resources.get('/XObject', DictionaryObject()).get_object()
+    xobjects[NameObject(BASE_FORM)] = writer._add_object(form.flate_encode())
+    resources[NameObject('/XObject')] = xobjects
+    content = DecodedStreamObject()
+    content.set_data(f'q {BASE_FORM} Do Q\n'.encode() + page.get_contents().get_data())
+    target[NameObject('/Resources')] = resources
+    target.replace_contents(content.flate_encode())
+
+
+def merge(main, parts, output_path):
+    """Lay each part's pages over the main document from its first page on; returns the output size.
+
+    Identical objects are then stored once, which removes the fonts, logo
+    and header, footer and backdrop forms that every part embeds again.
+    """
+    writer = PdfWriter(clone_from=PdfReader(BytesIO(main)))
+    for first_page, data in parts:
+        for offset, page in enumerate(PdfReader(BytesIO(data)).pages):
+            lay_over(writer, writer.pages[first_page - 1 + offset], page)
+    # One pass only merges objects that are already byte-identical; an image
+    # whose SMask was a duplicate becomes identical once the SMasks are
+    # merged, a form once its image is, so repeat until nothing changes
+    count = None
+    while count != (count := sum(obj is not None for obj in writer._objects)):
+        writer.compress_identical_objects(remove_duplicates=True, remove_unreferenced=True)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+        return f.tell()
+
+
+def parallel_pays_off(parts_cache, parts, jobs=None):
+    """True when render_parts() would beat one pass: jobs > 1 and most parts have to be laid out again.
+
+    The parts are loaded from parts_cache here, so pass the same PartCache
+    on to render_parts().
+    """
+    if (jobs or os.cpu_count()) == 1:
+        return False
+    # Volatile parts are laid out on every build and are small
+    dirty = [part for part in parts if part not in parts_cache.volatile and parts_cache.load(part) is None]
+    return len(dirty) > 1 and len(dirty) >= PARALLEL_MIN_SHARE * len(parts)
+
+
+def render_parts(pdf_class, front_matter, parts, output_path, jobs=None, parts_cache=None):
+    """Render front_matter and parts into output_path, taking unchanged parts from parts_cache.
+
+    Each part (a function drawing on a DocumentPDF, starting with a page
+    break) is laid out as a PDF of its own with part set, so it leaves the
+    page headers out, while this process lays out the front matter. As
+    the parts come back, add_part_pages() adds pages for them to the
+    main document with the header, the real page number and the part's
+    headings, for the outline and the table of contents; merge() then lays
+    the parts over them.
+
+    Parts that have to be laid out run on jobs worker processes (one per
+    core by default), or in this process with jobs=1. Without parts_cache
+    every part is laid out. The main document and the parts are made with
+    the options of parts_cache. Returns the main document, a report line and
+    the part cache, whose report() lists the parts reused and laid out.
+    """
+    start = time.perf_counter()
+    jobs = jobs or os.cpu_count()
+    parts_cache = parts_cache or PartCache(pdf_class, None)
+    cached = {part: parts_cache.load(part) for part in parts}
+    dirty = [part for part in parts if cached[part] is None]
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(dirty) > 1 else None
+    with pool or nullcontext():
+        futures = {part: pool.submit(render_part, (pdf_class, parts_cache.options, part)) for part in dirty} if pool else {}
+        # Named apart from a one-pass build, whose line cache holds every part's paragraphs
+        pdf = pdf_class(name=f'{pdf_class.__name__}.{front_matter.__name__}', **parts_cache.options)
+        front_matter(pdf)
+        rendered = []
+        slowest = 0
+        for part in parts:
+            if cached[part] is not None:
+                data, pages, headings = cached[part]
+            else:
+                job = (pdf_class, parts_cache.options, part)
+                data, pages, headings, assets, seconds = futures[part].result() if pool else render_part(job)
+                slowest = max(slowest, seconds)
+                parts_cache.store(part, data, pages, headings, assets)
+            rendered.append((pdf.add_part_pages(pages, headings), data))
+    if parts_cache.cache:
+        parts_cache.cache.evict()
+    layout = time.perf_counter() - start
+    size = merge(bytes(pdf.output()), rendered, output_path)
+    report = (f'{len(parts)} parts, {len(dirty)} laid out on {jobs if pool else 1} '
+              f'process{"es" if pool else ""}, slowest {slowest:.2f} s, '
+              f'layout {layout:.2f} s, merge {time.perf_counter() - start - layout:.2f} s, '
+              f'{size / 1024:.0f} KB')
+    return pdf, report, parts_cache
@@ -0,0 +1,172 @@
+"""
+PDF Document Specs
+Documents described as data and laid out by the components of a DocumentPDF class
+Broader AI
+
+A spec is a JSON file holding the whole content of a document:
+
+    {"spec_version": 1,
+     "output": "e:/modi/MODI_DOCUMENTATION_FINAL.pdf",
+     "front_matter": [<block>, ...],
+     "sections": [{"id": "executive_summary", "blocks": [<block>, ...]},
+                  {"id": "thank_you", "volatile": true, "blocks": [...]}]}
+
+Every block names one of the document class's components, with its
+arguments by parameter name:
+
+    {"type": "section_title", "title": "Product Vision", "num": "1.1"}
+
+load_spec() checks the whole spec against the class before anything is laid
+out. A block's type must be listed in the class's SPEC_BLOCKS and its
+arguments must bind to that component's signature, so a typo fails at once
+with the section and block it is in, not halfway through a build.
+
+Sections are parts in the sense of pdf_parallel: section(pdf) lays it out.
+They can be laid out in sequence, picked by id with DocumentSpec.select()
+for a partial build, or, when each starts with a page break, handed to
+render_parts() to be laid out in worker processes.
+A section's source is its canonical JSON, which is what the part cache keys
+it by. Volatile sections (stamped with the build time) are never cached.
+"""
+
+import inspect
+import json
+import os
+import time
+
+SPEC_VERSION = 1
+SPEC_KEYS = {'spec_version', 'output', 'front_matter', 'sections'}
+SECTION_KEYS = {'id', 'blocks', 'volatile'}
+
+
+class SpecError(ValueError):
+    """A spec that is malformed or does not fit the document class"""
+
+
+class Section:
+    """Blocks of one section; section(pdf) lays them out"""
+
+    def __init__(self, name, blocks, volatile=False, source=''):
+        self.__name__ = name
+        # (component name, keyword arguments) pairs
+        self.blocks = blocks
+        self.volatile = volatile
+        self.source = source
+
+    def __call__(self, pdf):
+        for name, args in self.blocks:
+            getattr(pdf, name)(**args)
+
+    def __repr__(self):
+        return f'Section({self.__name__!r}, {len(self.blocks)} blocks)'
+
+
+class DocumentSpec:
+    def __init__(self, output, front_matter, sections, seconds=0.0):
+        self.output = output
+        self.front_matter = front_matter
+        self.sections = sections
+        self.seconds = seconds
+
+    def output_path(self, draft=False, partial=False):
+        """Where the document is written; a draft or a build of only some sections goes beside it.
+
+        Such previews get a _DRAFT and/or _PARTIAL suffix, so they never
+        overwrite the real document.
+        """
+        suffix = ('_PARTIAL' if partial else '') + ('_DRAFT' if draft else '')
+        if not suffix:
+            return self.output
+        root, ext = os.path.splitext(self.output)
+        return f'{root}{suffix}{ext}'
+
+    @property
+    def volatile(self):
+        return [section for section in self.sections if section.volatile]
+
+    def select(self, names=None):
+        """Sections with the given ids, in document order; every section for None"""
+        if not names:
+            return list(self.sections)
+        known = [section.__name__ for section in self.sections]
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            raise SpecError(f'unknown section {", ".join(unknown)}; sections are {", ".join(known)}')
+        return [section for section in self.sections if section.__name__ in names]
+
+    def report(self):
+        blocks = len(self.front_matter.blocks) + sum(len(section.blocks) for section in self.sections)
+        return f'{len(self.sections)} sections, {blocks} blocks, loaded in {self.seconds * 1000:.1f} ms'
+
+
+def load_spec(path, pdf_class):
+    """Read and check the spec at path against pdf_class; raises SpecError"""
+    start = time.perf_counter()
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as error:
+        raise SpecError(f'{path}: {error}') from None
+    spec = parse_spec(data, pdf_class, path)
+    spec.seconds = time.perf_counter() - start
+    return spec
+
+
+def parse_spec(data, pdf_class, where='spec'):
+    """DocumentSpec from already decoded JSON data; raises SpecError"""
+    if not isinstance(data, dict):
+        raise SpecError(f'{where}: expected an object')
+    _check_keys(where, data, SPEC_KEYS, {'spec_version', 'output', 'sections'})
+    if data['spec_version'] != SPEC_VERSION:
+        raise SpecError(f'{where}: spec_version {data["spec_version"]} is not {SPEC_VERSION}')
+    if not isinstance(data['output'], str):
+        raise SpecError(f'{where}: output must be a path')
+    signatures = {}
+    front_matter = Section('front_matter', _blocks(pdf_class, signatures, f'{where}: front_matter',
+                                                   data.get('front_matter', [])))
+    if not isinstance(data['sections'], list):
+        raise SpecError(f'{where}: sections must be a list')
+    sections = []
+    for index, section in enumerate(data['sections']):
+        if not isinstance(section, dict):
+            raise SpecError(f'{where}: sections[{index}]: expected an object')
+        _check_keys(f'{where}: sections[{index}]', section, SECTION_KEYS, {'id', 'blocks'})
+        name = section['id']
+        if not isinstance(name, str) or not name.isidentifier():
+            raise SpecError(f'{where}: sections[{index}]: id must be an identifier, not {name!r}')
+        if any(other.__name__ == name for other in sections):
+            raise SpecError(f'{where}: section {name} appears twice')
+        blocks = _blocks(pdf_class, signatures, f'{where}: section {name}', section['blocks'])
+        source = json.dumps(section, sort_keys=True, ensure_ascii=False)
+        sections.append(Section(name, blocks, bool(section.get('volatile')), source))
+    return DocumentSpec(data['output'], front_matter, sections)
+
+
+def _check_keys(where, mapping, allowed, required):
+    unknown = mapping.keys() - allowed
+    if unknown:
+        raise SpecError(f'{where}: unknown key {", ".join(sorted(unknown))}')
+    missing = required - mapping.keys()
+    if missing:
+        raise SpecError(f'{where}: missing {", ".join(sorted(missing))}')
+
+
+def _blocks(pdf_class, signatures, where, blocks):
+    if not isinstance(blocks, list):
+        raise SpecError(f'{where}: blocks must be a list')
+    checked = []
+    for index, block in enumerate(blocks):
+        if not isinstance(block, dict) or not isinstance(block.get('type'), str):
+            raise SpecError(f'{where}, block {index}: expected an object with a "type"')
+        args = dict(block)
+        name = args.pop('type')
+        if name not in pdf_class.SPEC_BLOCKS:
+            raise SpecError(f'{where}, block {index}: {pdf_class.__name__} has no block type {name!r}')
+        if name not in signatures:
+            signatures[name] = inspect.signature(getattr(pdf_class, name))
+        try:
+            signatures[name].bind(None, **args)
+        except TypeError as error:
+            raise SpecError(f'{where}, block {index} ({name}): {error}') from None
+        checked.append((name, args))
+    return checked
@@ -0,0 +1,128 @@
+"""
+PDF Streaming Output
+Writes documents whose finished pages have already left memory
+Broader AI
+"""
+
+import hashlib
+import os
+import tempfile
+import zlib
+
+from fpdf.output import OutputProducer, PDFContentStream, _dimensions_to_mediabox
+from fpdf.syntax import Name, PDFObject, create_dictionary_string
+
+
+class PageSpill:
+    """Temporary file holding the content streams of finished pages.
+
+    A DocumentPDF created with spill=True adds each page as soon as the
+    next one is started, compressed exactly as output() would compress it;
+    only its offset stays in memory. Pages output() still draws on (those
+    reserved for a table of contents, those using the page count alias and
+    the last page) are kept in memory instead.
+    """
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        # page index -> (offset, length, compressed)
+        self.pages = {}
+        self.raw_bytes = 0
+        self.size = 0
+
+    def add(self, index, contents, compress):
+        data = zlib.compress(contents, level=PDFContentStream._COMPRESSION_LEVEL) if compress else bytes(contents)
+        self.pages[index] = (self.file.tell(), len(data), compress)
+        self.file.write(data)
+        self.raw_bytes += len(contents)
+        self.size += len(data)
+
+    def read(self, offset, length):
+        self.file.seek(offset)
+        data = self.file.read(length)
+        self.file.seek(0, os.SEEK_END)
+        return data
+
+    def stream(self, index):
+        """Content stream object of a spilled page, read back when it is serialized"""
+        return SpilledContentStream(self, *self.pages[index])
+
+    def close(self):
+        self.file.close()
+
+    def report(self):
+        return (f'{len(self.pages)} pages spilled, {self.raw_bytes / 1024:.0f} KB of operators '
+                f'({self.size / 1024:.0f} KB on disk) kept out of memory')
+
+
+class SpilledContentStream(PDFContentStream):
+    def __init__(self, spill, offset, length, compressed):
+        PDFObject.__init__(self)
+        self._spill = spill
+        self._offset = offset
+        self.filter = Name('FlateDecode') if compressed else None
+        self.length = length
+
+    def content_stream(self):
+        return self._spill.read(self._offset, self.length)
+
+
+class OutputFile:
+    """Stand-in for OutputProducer.buffer that writes through to a file; len() is the bytes written"""
+
+    def __init__(self, file):
+        self.file = file
+        self.size = 0
+        self.digest = hashlib.new('md5', usedforsecurity=False)
+
+    def __len__(self):
+        return self.size
+
+    def __iadd__(self, data):
+        self.file.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+        return self
+
+    def file_id(self, creation_date=None):
+        """FPDF._default_file_id() of everything written so far"""
+        digest = self.digest.copy()
+        if creation_date:
+            digest.update(creation_date.strftime('%Y%m%d%H%M%S').encode('utf8'))
+        value = digest.hexdigest().upper()
+        return f'<{value}><{value}>'
+
+
+class StreamingOutputProducer(OutputProducer):
+    """OutputProducer writing to file as it serializes, with spilled pages read back one at a time.
+
+    Object offsets are recorded as they are written, for the xref table at
+    the end, and the file ID is hashed from the bytes going out, so the
+    file is byte for byte the one OutputProducer would have built in
+    memory. Fonts and images are still written at the end.
+    """
+
+    def __init__(self, fpdf, file, spill):
+        super().__init__(fpdf)
+        self.buffer = OutputFile(file)
+        self.spill = spill
+
+    def _add_pages(self, _slice=slice(0, None)):
+        # Same as OutputProducer._add_pages(), except for where the content comes from
+        fpdf = self.fpdf
+        page_objs = []
+        for page_obj in list(self._iter_pages_in_order())[_slice]:
+            if fpdf.pdf_version > '1.3' and fpdf.allow_images_transparency:
+                group = {'/Type': '/Group', '/S': '/Transparency', '/CS': '/DeviceRGB'}
+                page_obj.group = create_dictionary_string(group, field_join=' ')
+            if page_obj.dimensions() != fpdf.default_page_dimensions:
+                page_obj.media_box = _dimensions_to_mediabox(page_obj.dimensions())
+            self._add_pdf_obj(page_obj, 'pages')
+            page_objs.append(page_obj)
+            if page_obj.index() in self.spill.pages:
+                cs_obj = self.spill.stream(page_obj.index())
+            else:
+                cs_obj = PDFContentStream(contents=page_obj.contents, compress=fpdf.compress)
+            self._add_pdf_obj(cs_obj, 'pages')
+            page_obj.contents = cs_obj
+        return page_objs
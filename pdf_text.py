@@ -0,0 +1,76 @@
+"""
+PDF Line Breaking
+Memoised line breaking for the multi_cell() paragraphs of the document scripts
+Broader AI
+"""
+
+import fpdf
+import pickle
+
+from asset_cache import cache_key
+
+CACHE_NAME = 'line_breaks'
+# Bump whenever the stored line format changes
+CACHE_VERSION = 1
+
+
+class LineBreakCache:
+    """Memo of broken paragraphs: key -> tuple of (fragment strings, TextLine fields after fragments)
+
+    The key is the text and every setting that changes where its lines
+    break, so a hit is rendered without measuring or breaking. With a
+    ContentCache, save() stores the entries a build used under the
+    document's name, for the next build to load.
+    """
+
+    def __init__(self, name, cache=None):
+        self.cache = cache
+        self.entry_key = cache_key(CACHE_NAME, CACHE_VERSION, fpdf.__version__, name)
+        self.lines = {}
+        self.used = set()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stored = {}
+        if cache:
+            data = cache.load(self.entry_key)
+            if data is not None:
+                self.stored = pickle.loads(data)
+
+    def get(self, key, break_lines):
+        """Lines of the paragraph for key, calling break_lines() only on a miss"""
+        self.used.add(key)
+        lines = self.lines.get(key)
+        if lines is not None:
+            self.hits += 1
+            return lines
+        lines = self.stored.get(key)
+        if lines is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            lines = break_lines()
+        self.lines[key] = lines
+        return lines
+
+    def save(self, prune=True):
+        """Store the entries used by this build, if anything changed since the last one.
+
+        prune=False keeps the stored entries this build did not use, for a
+        build that laid out only part of the document.
+        """
+        if not self.cache or not self.used or self.used == self.stored.keys():
+            return
+        table = {key: self.lines[key] for key in self.used}
+        if not prune:
+            if table.keys() <= self.stored.keys():
+                return
+            table = {**self.stored, **table}
+        self.cache.store(self.entry_key, pickle.dumps(table, protocol=pickle.HIGHEST_PROTOCOL))
+        self.stored = table
+
+    def report(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        rate = (self.hits + self.disk_hits) / lookups * 100 if lookups else 0.0
+        return (f'{lookups} paragraphs, {self.hits + self.disk_hits} cached ({rate:.0f}% hit rate, '
+                f'{self.disk_hits} from the previous build), {self.misses} broken')
@@ -1,24 +1,721 @@
+"""
+Logo Background Remover
+Makes the white background of brand images transparent
+Broader AI
+
+Usage:
+    python remove_bg.py                              # the Broader AI logo
+    python remove_bg.py assets/images web/icons      # every image in those folders
+    python remove_bg.py "assets/screenshots/*.png" --jobs 4
+    python remove_bg.py assets/images --mode soft --inner 20 --outer 60 --despill
+    python remove_bg.py assets/images/medical_logo.png --mode flood --tolerance 20 --connectivity 8
+    python remove_bg.py brochure_print.png --tile-rows 256      # bounded memory for huge art
+    python remove_bg.py --trim --padding 8                      # crop to the logo, write logo_transparent.json
+
+Results are cached by source content and parameters (see asset_cache.py), so
+re-running a batch over unchanged assets only copies the cached outputs.
+"""
+
 from PIL import Image
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from io import BytesIO
+import argparse
+import glob
+import json
+import os
+import struct
+import time
+import zlib
+
+from asset_cache import CACHE_ROOT, DEFAULT_MAX_BYTES, ContentCache, cache_key, file_digest
+
+SOURCE_PATH = 'e:/modi/assets/broader_ai_logo.png'
+OUTPUT_PATH = 'e:/modi/assets/broader_ai_logo_transparent.png'
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp')
+OUTPUT_SUFFIX = '_transparent'
+
+# Pixels with R, G and B all above this value count as background
+WHITE_THRESHOLD = 240
+TRANSPARENT = (255, 255, 255, 0)
+TRANSPARENT_PACKED = np.array(TRANSPARENT, dtype=np.uint8).view(np.uint32)[0]
 
-# Load the logo
-img = Image.open('e:/modi/assets/broader_ai_logo.png')
-img = img.convert('RGBA')
+# Soft mode: alpha ramps from 0 at `inner` to fully opaque at `outer`,
+# measured as RGB distance from the key colour
+KEY_COLOR = (255, 255, 255)
+SOFT_INNER = 25
+SOFT_OUTER = 60
 
-# Get pixel data
-data = img.getdata()
+# Flood mode: a pixel is background when every channel is within `tolerance`
+# of the key colour AND it is connected to the image border through such pixels
+FLOOD_TOLERANCE = 15
+CONNECTIVITY = (4, 8)
 
-# Create new data with transparent white
-new_data = []
-for item in data:
-    # If pixel is white or near white, make it transparent
-    if item[0] > 240 and item[1] > 240 and item[2] > 240:
-        new_data.append((255, 255, 255, 0))  # Transparent
+MODES = ('hard', 'soft', 'flood')
+
+# Tiled mode: rows per strip; 0 processes the whole image at once
+TILE_ROWS = 512
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Samples per pixel of each 8-bit PNG colour type the strip reader handles
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# Bytes of compressed image data read at a time
+PNG_READ_SIZE = 1024 * 1024
+
+CACHE_NAME = 'remove_bg'
+# Bump whenever the output for the same source and options changes
+CACHE_VERSION = 1
+
+
+def load_rgba(path):
+    """Decode an image straight into a writable H x W x 4 uint8 array"""
+    with Image.open(path) as img:
+        return np.array(img.convert('RGBA'))
+
+
+def clear_pixels(pixels, mask):
+    """Set the masked pixels to TRANSPARENT, in place"""
+    if pixels.strides[-2:] == (4, 1):
+        # One 32-bit store per pixel instead of a masked write to each channel
+        pixels.view(np.uint32)[..., 0][mask] = TRANSPARENT_PACKED
     else:
-        new_data.append(item)
+        pixels[mask] = TRANSPARENT
+
+
+def key_white(pixels, threshold=WHITE_THRESHOLD):
+    """Replace near-white pixels with transparent white, in place, in one pass"""
+    # The darkest channel is above the threshold exactly when all three are
+    mask = np.minimum(np.minimum(pixels[..., 0], pixels[..., 1]), pixels[..., 2]) > threshold
+    clear_pixels(pixels, mask)
+    return mask
+
+
+def key_soft(pixels, key_color=KEY_COLOR, inner=SOFT_INNER, outer=SOFT_OUTER, despill=False):
+    """Feathered keying: scale alpha by each pixel's distance from the key colour.
+
+    Distance <= inner becomes fully transparent, >= outer keeps its alpha and
+    the band in between fades linearly, which removes the jagged halo the hard
+    threshold leaves around anti-aliased edges. With despill the key colour
+    mixed into edge pixels is subtracted back out so they do not look washed out
+    on dark backgrounds. Works on the whole array at once, in place.
+    """
+    if outer <= inner:
+        raise ValueError('outer must be greater than inner')
+    key = np.asarray(key_color, dtype=np.float32)
+    rgb = pixels[..., :3].astype(np.float32)
+    rgb -= key
+    distance = np.sqrt(np.einsum('...c,...c->...', rgb, rgb))
+    coverage = np.clip((distance - inner) / (outer - inner), 0.0, 1.0)
+
+    edge = (coverage > 0) & (coverage < 1)
+    if despill and edge.any():
+        # observed = a * colour + (1 - a) * key  =>  colour = key + (observed - key) / a
+        a = coverage[edge][:, None]
+        pixels[edge, :3] = np.clip(key + rgb[edge] / a + 0.5, 0, 255).astype(np.uint8)
+
+    alpha = pixels[..., 3]
+    np.multiply(alpha, coverage, out=coverage)
+    alpha[...] = (coverage + 0.5).astype(np.uint8)
+    mask = alpha == 0
+    clear_pixels(pixels, mask)
+    return mask
+
+
+def mask_runs(mask):
+    """Horizontal runs of True in a 2D mask as (row, start, end) arrays, end exclusive, in raster order"""
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+
+def paint_runs(shape, rows, starts, ends):
+    """Inverse of mask_runs: rasterise (row, start, end) runs back into a boolean mask"""
+    height, width = shape
+    # Runs on a row are separated by at least one pixel, so no start ever lands on an end
+    marks = np.zeros((height, width + 1), dtype=np.int8)
+    marks[rows, starts] = 1
+    marks[rows, ends] = -1
+    return np.cumsum(marks, axis=1, dtype=np.int8)[:, :width] > 0
+
+
+def run_components(rows, starts, ends, width, connectivity=4):
+    """Label the connected components of a run-length encoded mask.
+
+    Runs in neighbouring rows touch when their column spans overlap (or are
+    diagonal neighbours, for 8-connectivity). Every run finds its touching
+    runs in the next row with two binary searches over the whole run list, and
+    the touches are merged with a union-find, so the cost is linear in the
+    number of runs rather than the number of pixels.
+    Returns an array with one component root per run.
+    """
+    count = len(rows)
+    parent = list(range(count))
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    reach = 1 if connectivity == 8 else 0
+    stride = width + 2
+    rows64 = rows.astype(np.int64)
+    start_keys = rows64 * stride + starts
+    end_keys = rows64 * stride + ends
+    # Runs in the next row with end > start - reach and start < end + reach
+    below = (rows64 + 1) * stride
+    first = np.searchsorted(end_keys, below + starts - reach, side='right')
+    last = np.searchsorted(start_keys, below + ends + reach, side='left')
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for run in np.nonzero(last > first)[0].tolist():
+        root = find(run)
+        for other in range(first[run], last[run]):
+            other_root = find(other)
+            if other_root != root:
+                parent[other_root] = root
+    return np.array([find(i) for i in range(count)], dtype=np.int64)
+
+
+def border_runs(rows, starts, ends, shape, connectivity=4):
+    """Filter runs down to the ones whose component touches the image border"""
+    height, width = shape
+    roots = run_components(rows, starts, ends, width, connectivity)
+    on_border = (rows == 0) | (rows == height - 1) | (starts == 0) | (ends == width)
+    keep = np.isin(roots, roots[on_border])
+    return rows[keep], starts[keep], ends[keep]
+
+
+def border_connected(mask, connectivity=4):
+    """Keep only the parts of a boolean mask that are connected to the image border"""
+    rows, starts, ends = border_runs(*mask_runs(mask), mask.shape, connectivity)
+    return paint_runs(mask.shape, rows, starts, ends)
+
+
+def background_candidates(pixels, key_color=KEY_COLOR, tolerance=FLOOD_TOLERANCE):
+    """Pixels within tolerance of the key colour on every channel, plus already transparent ones"""
+    key = np.asarray(key_color, dtype=np.int16)
+    close = (np.abs(pixels[..., :3].astype(np.int16) - key) <= tolerance).all(axis=-1)
+    return close | (pixels[..., 3] == 0)
+
+
+def key_flood(pixels, key_color=KEY_COLOR, tolerance=FLOOD_TOLERANCE, connectivity=4):
+    """Make only the background that touches the image border transparent.
+
+    Unlike the hard threshold this leaves enclosed white areas such as the
+    lettering inside medical_logo.png opaque.
+    """
+    if connectivity not in CONNECTIVITY:
+        raise ValueError('connectivity must be 4 or 8')
+    mask = border_connected(background_candidates(pixels, key_color, tolerance), connectivity)
+    clear_pixels(pixels, mask)
+    return mask
+
+
+def key_pixels(pixels, mode='hard', threshold=WHITE_THRESHOLD, key_color=KEY_COLOR,
+               inner=SOFT_INNER, outer=SOFT_OUTER, despill=False,
+               tolerance=FLOOD_TOLERANCE, connectivity=4):
+    """Run the chosen keying mode over an RGBA array; returns the fully transparent mask"""
+    if mode == 'soft':
+        return key_soft(pixels, key_color, inner, outer, despill)
+    if mode == 'flood':
+        return key_flood(pixels, key_color, tolerance, connectivity)
+    if mode == 'hard':
+        return key_white(pixels, threshold)
+    raise ValueError(f'Unknown mode: {mode}')
+
+
+def opaque_bbox(alpha):
+    """(left, top, right, bottom) of the non-transparent pixels, exclusive; None if all transparent"""
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(alpha[rows[0]:rows[-1] + 1].any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def merge_boxes(boxes):
+    if not boxes:
+        return None
+    lefts, tops, rights, bottoms = zip(*boxes)
+    return min(lefts), min(tops), max(rights), max(bottoms)
+
+
+def pad_box(box, padding, size):
+    """Grow a crop box by padding pixels on every side, clamped to the canvas.
+
+    A fully transparent image has no box and keeps its whole canvas.
+    """
+    width, height = size
+    if box is None:
+        return 0, 0, width, height
+    left, top, right, bottom = box
+    return (max(left - padding, 0), max(top - padding, 0),
+            min(right + padding, width), min(bottom + padding, height))
+
+
+def crop_info_path(output):
+    """assets/logo_transparent.png -> assets/logo_transparent.json"""
+    return os.path.splitext(output)[0] + '.json'
+
+
+def write_crop_info(output, source, source_size, box):
+    """Record where the trimmed image sits on its original canvas, next to the output"""
+    left, top, right, bottom = box
+    info = {
+        'source': os.path.basename(source),
+        'source_size': list(source_size),
+        'crop_box': [left, top, right, bottom],
+        'size': [right - left, bottom - top],
+        'aspect_ratio': round((right - left) / (bottom - top), 6),
+    }
+    with open(crop_info_path(output), 'w') as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def remove_background(source, output, tile_rows=0, trim=False, padding=0, **options):
+    """Key source into output; with trim, crop to the opaque area and return the crop box"""
+    if tile_rows:
+        return remove_background_tiled(source, output, tile_rows, trim, padding, **options)
+    pixels = load_rgba(source)
+    key_pixels(pixels, **options)
+    box = None
+    if trim:
+        height, width = pixels.shape[:2]
+        box = pad_box(opaque_bbox(pixels[..., 3]), padding, (width, height))
+        left, top, right, bottom = box
+        pixels = pixels[top:bottom, left:right]
+        write_crop_info(output, source, (width, height), box)
+    Image.fromarray(pixels, 'RGBA').save(output, 'PNG')
+    return box
+
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(data, zlib.crc32(kind)))
+
+
+# |byte| when read as a signed int8, the per-byte cost of a filtered row
+FILTER_COST = np.minimum(np.arange(256), 256 - np.arange(256)).astype(np.uint8)
+
+
+class PngStripWriter:
+    """Streams an RGBA PNG to disk one strip of rows at a time.
+
+    Each row is written with whichever of the None, Sub or Up filters gives
+    the smallest absolute sum (the usual PNG heuristic), chosen for the whole
+    strip at once with numpy, and deflated incrementally, so only the current
+    strip and the last row of the previous one are ever held in memory.
+    """
+
+    def __init__(self, path, width, height, level=6):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self.previous_row = np.zeros(width * 4, dtype=np.uint8)
+        self.compressor = zlib.compressobj(level)
+        self.file = open(path, 'wb')
+        self.file.write(PNG_SIGNATURE)
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self.file.write(png_chunk(kind, data))
+
+    def write(self, pixels):
+        rows = pixels.reshape(len(pixels), self.width * 4)
+        above = np.vstack((self.previous_row, rows[:-1]))
+        sub = rows.copy()
+        sub[:, 4:] -= rows[:, :-4]
+        up = rows - above
+        candidates = np.stack((rows, sub, up))
+        cost = FILTER_COST[candidates].sum(axis=2, dtype=np.int64)
+        best = cost.argmin(axis=0)
+        filtered = np.empty((len(rows), self.width * 4 + 1), dtype=np.uint8)
+        filtered[:, 0] = best
+        filtered[:, 1:] = candidates[best, np.arange(len(rows))]
+        data = self.compressor.compress(filtered.tobytes())
+        if data:
+            self._chunk(b'IDAT', data)
+        self.previous_row = rows[-1].copy()
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self.rows_written != self.height:
+            self.file.close()
+            raise ValueError(f'wrote {self.rows_written} of {self.height} rows')
+        self._chunk(b'IDAT', self.compressor.flush())
+        self._chunk(b'IEND', b'')
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+
+class PngStripReader:
+    """Decodes an 8-bit, non-interlaced PNG one strip of rows at a time.
+
+    The image data is inflated only as far as the next strip. Each strip's
+    filtered rows go to Pillow as a PNG of their own, behind the last row
+    of the previous strip stored unfiltered, since the first row may be
+    filtered against it; the palette and transparency chunks are copied
+    over, so the strip converts to RGBA exactly as the whole image would.
+    Raises ValueError for any other PNG, or a file that is not one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = {}
+        with open(path, 'rb') as f:
+            if f.read(8) != PNG_SIGNATURE:
+                raise ValueError(f'{path}: not a PNG')
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f'{path}: no image data')
+                length, kind = struct.unpack('>I4s', header)
+                if kind == b'IDAT':
+                    self.data_offset = f.tell() - 8
+                    break
+                data = f.read(length)
+                f.seek(4, os.SEEK_CUR)
+                if kind in (b'IHDR', b'PLTE', b'tRNS'):
+                    self.chunks[kind] = data
+        width, height, depth, self.colour_type, _, _, interlace = struct.unpack('>IIBBBBB', self.chunks[b'IHDR'])
+        if depth != 8 or interlace or self.colour_type not in PNG_CHANNELS:
+            raise ValueError(f'{path}: only 8-bit, non-interlaced PNGs are read in strips')
+        self.size = width, height
+        self.row_bytes = width * PNG_CHANNELS[self.colour_type]
+
+    def _image_data(self, f):
+        """Compressed data of the consecutive IDAT chunks, in pieces of at most PNG_READ_SIZE"""
+        f.seek(self.data_offset)
+        while True:
+            length, kind = struct.unpack('>I4s', f.read(8))
+            if kind != b'IDAT':
+                return
+            while length:
+                data = f.read(min(length, PNG_READ_SIZE))
+                length -= len(data)
+                yield data
+            f.seek(4, os.SEEK_CUR)
+
+    def _decode(self, filtered, previous):
+        """(RGBA array, last row unfiltered) of whole filtered rows"""
+        width = self.size[0]
+        if previous is not None:
+            filtered = b'\x00' + previous + filtered
+        height = len(filtered) // (self.row_bytes + 1)
+        png = [PNG_SIGNATURE, png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, self.colour_type, 0, 0, 0))]
+        png += [png_chunk(kind, self.chunks[kind]) for kind in (b'PLTE', b'tRNS') if kind in self.chunks]
+        png += [png_chunk(b'IDAT', zlib.compress(filtered, 0)), png_chunk(b'IEND', b'')]
+        with Image.open(BytesIO(b''.join(png))) as img:
+            img.load()
+            # In these modes Pillow holds the unfiltered samples as they are
+            last = img.crop((0, height - 1, width, height)).tobytes()
+            pixels = np.array(img.convert('RGBA'))
+        return (pixels if previous is None else pixels[1:]), last
+
+    def strips(self, tile_rows):
+        """Yield (top, RGBA array) for consecutive strips of tile_rows rows"""
+        strip_bytes = tile_rows * (self.row_bytes + 1)
+        decompressor = zlib.decompressobj()
+        pending = b''
+        previous = None
+        top = 0
+        with open(self.path, 'rb') as f:
+            for data in self._image_data(f):
+                while data:
+                    pending += decompressor.decompress(data, strip_bytes - len(pending))
+                    data = decompressor.unconsumed_tail
+                    if len(pending) == strip_bytes:
+                        pixels, previous = self._decode(pending, previous)
+                        yield top, pixels
+                        top += tile_rows
+                        pending = b''
+        pending += decompressor.flush()
+        if pending:
+            pixels, previous = self._decode(pending, previous)
+            yield top, pixels
+
+
+@contextmanager
+def open_strips(source):
+    """A PngStripReader for source, or the decoded image when it cannot be read in strips"""
+    try:
+        reader = PngStripReader(source)
+    except ValueError:
+        reader = None
+    if reader:
+        yield reader
+        return
+    with Image.open(source) as img:
+        img.load()
+        yield img
+
+
+def iter_strips(img, tile_rows):
+    """Yield (top, RGBA array) for consecutive horizontal strips of a PngStripReader or an open image"""
+    if isinstance(img, PngStripReader):
+        yield from img.strips(tile_rows)
+        return
+    width, height = img.size
+    for top in range(0, height, tile_rows):
+        strip = img.crop((0, top, width, min(top + tile_rows, height)))
+        yield top, np.array(strip.convert('RGBA'))
+
+
+def tiled_flood_runs(img, tile_rows, key_color=KEY_COLOR, tolerance=FLOOD_TOLERANCE, connectivity=4):
+    """Border-connected background of a whole image, as runs, built strip by strip.
+
+    Only the run-length encoding of each strip's candidate mask is kept, and
+    the runs are labelled together afterwards, so components crossing strip
+    boundaries are stitched exactly as in the untiled flood fill.
+    """
+    parts = []
+    for top, strip in iter_strips(img, tile_rows):
+        rows, starts, ends = mask_runs(background_candidates(strip, key_color, tolerance))
+        parts.append((rows + top, starts, ends))
+    rows, starts, ends = (np.concatenate(column) for column in zip(*parts))
+    width, height = img.size
+    return border_runs(rows, starts, ends, (height, width), connectivity)
+
+
+def keyed_strips(img, tile_rows, mode='hard', **options):
+    """Yield (top, keyed RGBA strip) for an open image; flood mode labels all runs first"""
+    if mode == 'flood':
+        rows, starts, ends = tiled_flood_runs(img, tile_rows, **options)
+    for top, strip in iter_strips(img, tile_rows):
+        if mode == 'flood':
+            first, last = np.searchsorted(rows, (top, top + len(strip)))
+            clear_pixels(strip, paint_runs(strip.shape[:2], rows[first:last] - top,
+                                           starts[first:last], ends[first:last]))
+        else:
+            key_pixels(strip, mode, **options)
+        yield top, strip
+
+
+def remove_background_tiled(source, output, tile_rows=TILE_ROWS, trim=False, padding=0, **options):
+    """Key a large image in fixed-height strips, streaming the result to disk.
+
+    An 8-bit, non-interlaced PNG is decoded strip by strip as well, so
+    memory is bounded by one strip (plus, in flood mode, the run-length
+    encoded background mask). Any other source is decoded by Pillow once
+    as a whole, and only the keying buffers and the PNG encoder are
+    bounded by a strip. Flood mode makes an extra pass to label the runs
+    first, and trimming makes one to find the opaque bounding box before
+    writing. Returns the crop box when trimming, else None.
+    """
+    with open_strips(source) as img:
+        width, height = img.size
+        box = None
+        if trim:
+            bounds = []
+            for top, strip in keyed_strips(img, tile_rows, **options):
+                strip_box = opaque_bbox(strip[..., 3])
+                if strip_box:
+                    bounds.append((strip_box[0], strip_box[1] + top, strip_box[2], strip_box[3] + top))
+            box = pad_box(merge_boxes(bounds), padding, (width, height))
+        left, upper, right, lower = box or (0, 0, width, height)
+        with PngStripWriter(output, right - left, lower - upper) as writer:
+            for top, strip in keyed_strips(img, tile_rows, **options):
+                first, last = max(upper - top, 0), min(lower - top, len(strip))
+                if first < last:
+                    writer.write(np.ascontiguousarray(strip[first:last, left:right]))
+    if trim:
+        write_crop_info(output, source, (width, height), box)
+    return box
+
+
+def remove_background_cached(source, output, cache, **options):
+    """remove_background() that reuses a cached result; returns True on a cache hit"""
+    key = cache_key(CACHE_NAME, CACHE_VERSION, file_digest(source), options)
+    # A trimmed result is only complete with its crop sidecar, so both are cached
+    info_key = cache_key(key, 'crop_info')
+    trim = options.get('trim')
+    if cache.fetch_file(key, output) and (not trim or cache.fetch_file(info_key, crop_info_path(output))):
+        return True
+    remove_background(source, output, **options)
+    cache.store_file(key, output)
+    if trim:
+        cache.store_file(info_key, crop_info_path(output))
+    return False
+
+
+def transparent_path(source):
+    """assets/images/logo.png -> assets/images/logo_transparent.png"""
+    stem, _ = os.path.splitext(source)
+    return stem + OUTPUT_SUFFIX + '.png'
+
+
+def collect_images(targets):
+    """Expand directories and glob patterns into a sorted list of source images.
+
+    Previously generated *_transparent files are skipped so re-running a batch
+    never keys its own output.
+    """
+    found = set()
+    for target in targets:
+        if os.path.isdir(target):
+            matches = [os.path.join(target, name) for name in os.listdir(target)]
+        else:
+            matches = glob.glob(target)
+        for path in matches:
+            stem, ext = os.path.splitext(path)
+            if not os.path.isfile(path) or ext.lower() not in IMAGE_EXTENSIONS:
+                continue
+            if stem.endswith(OUTPUT_SUFFIX):
+                continue
+            found.add(os.path.normpath(path))
+    return sorted(found)
+
+
+def _process_file(job):
+    source, options, cache_root = job
+    output = transparent_path(source)
+    # CPU time, so that workers sharing a core do not count each other's turns
+    start = time.process_time()
+    if cache_root:
+        # Eviction is left to the parent so workers never delete under each other
+        cache = ContentCache(CACHE_NAME, cache_root)
+        hit = remove_background_cached(source, output, cache, **options)
+    else:
+        remove_background(source, output, **options)
+        hit = False
+    return source, output, time.process_time() - start, hit
+
+
+def remove_backgrounds(sources, options=None, jobs=None, cache_root=None):
+    """Key every source on a process pool, yielding (source, output, CPU seconds, cache hit) as files finish.
+
+    Largest files are submitted first so one big image does not end up alone
+    at the tail of the batch while the other workers sit idle.
+    """
+    sources = sorted(sources, key=os.path.getsize, reverse=True)
+    work = [(source, options or {}, cache_root) for source in sources]
+    if jobs == 1 or len(work) <= 1:
+        for job in work:
+            yield _process_file(job)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_process_file, job) for job in work]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def parse_color(text):
+    """'255,255,255' or '#ffffff' -> (255, 255, 255)"""
+    text = text.strip()
+    if text.startswith('#') and len(text) == 7:
+        return tuple(int(text[i:i + 2], 16) for i in (1, 3, 5))
+    parts = [int(part) for part in text.split(',')]
+    if len(parts) != 3 or not all(0 <= part <= 255 for part in parts):
+        raise argparse.ArgumentTypeError(f'not a colour: {text}')
+    return tuple(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Make the white background of images transparent.')
+    parser.add_argument('targets', nargs='*',
+                        help='image files, directories or glob patterns (default: the Broader AI logo)')
+    parser.add_argument('--mode', choices=MODES, default='hard',
+                        help='hard: global white threshold; soft: feathered alpha from key distance; '
+                             'flood: only background connected to the image border')
+    parser.add_argument('--threshold', type=int, default=WHITE_THRESHOLD,
+                        help='hard mode: R, G and B must all exceed this to be keyed out (default: %(default)s)')
+    parser.add_argument('--key', type=parse_color, default=KEY_COLOR,
+                        help='soft/flood mode: key colour as R,G,B or #rrggbb (default: white)')
+    parser.add_argument('--inner', type=float, default=SOFT_INNER,
+                        help='soft mode: distance at or below which pixels are fully transparent (default: %(default)s)')
+    parser.add_argument('--outer', type=float, default=SOFT_OUTER,
+                        help='soft mode: distance at or above which pixels stay opaque (default: %(default)s)')
+    parser.add_argument('--despill', action='store_true',
+                        help='soft mode: remove the key colour bleeding into edge pixels')
+    parser.add_argument('--tolerance', type=int, default=FLOOD_TOLERANCE,
+                        help='flood mode: max per-channel difference from the key colour (default: %(default)s)')
+    parser.add_argument('--connectivity', type=int, choices=CONNECTIVITY, default=4,
+                        help='flood mode: 4 or 8 neighbour connectivity (default: %(default)s)')
+    parser.add_argument('--tile-rows', type=int, default=0,
+                        help=f'process in strips of this many rows to bound memory on very large images '
+                             f'(e.g. {TILE_ROWS}; default: whole image)')
+    parser.add_argument('--trim', action='store_true',
+                        help='crop to the opaque bounding box and record it in a .json sidecar')
+    parser.add_argument('--padding', type=int, default=0,
+                        help='with --trim, keep this many transparent pixels around the content (default: %(default)s)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU core)')
+    parser.add_argument('--cache-dir', default=CACHE_ROOT,
+                        help='result cache location (default: %(default)s)')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='evict least recently used results above this many MB (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always reprocess and leave the cache untouched')
+    args = parser.parse_args(argv)
+    cache_root = None if args.no_cache else args.cache_dir
+
+    options = {'mode': args.mode}
+    if args.tile_rows:
+        options['tile_rows'] = args.tile_rows
+    if args.trim:
+        options.update(trim=True, padding=args.padding)
+    if args.mode == 'hard':
+        options['threshold'] = args.threshold
+    elif args.mode == 'flood':
+        options.update(key_color=args.key, tolerance=args.tolerance, connectivity=args.connectivity)
+    else:
+        if args.outer <= args.inner:
+            parser.error('--outer must be greater than --inner')
+        options.update(key_color=args.key, inner=args.inner, outer=args.outer, despill=args.despill)
+
+    if not args.targets:
+        if cache_root:
+            cache = ContentCache(CACHE_NAME, cache_root, args.cache_size * 1024 * 1024)
+            if remove_background_cached(SOURCE_PATH, OUTPUT_PATH, cache, **options):
+                print('Transparent logo is up to date (cached).')
+                return
+            cache.evict()
+        else:
+            remove_background(SOURCE_PATH, OUTPUT_PATH, **options)
+        print('Transparent logo created!')
+        return
+
+    sources = collect_images(args.targets)
+    if not sources:
+        print('No images found.')
+        return
+
+    start = time.perf_counter()
+    cpu = 0.0
+    hits = 0
+    for source, output, seconds, hit in remove_backgrounds(sources, options, args.jobs, cache_root):
+        cpu += seconds
+        hits += hit
+        note = '  (cached)' if hit else ''
+        print(f'  {seconds * 1000:8.1f} ms CPU  {source} -> {os.path.basename(output)}{note}')
+    wall = time.perf_counter() - start
+
+    # CPU time over wall time is how many cores were kept busy, not a speedup
+    # over a serial run, which was never measured
+    print(f'\n  {len(sources)} images in {wall:.2f} s '
+          f'({cpu:.2f} s of CPU time, {cpu / wall if wall else 0:.1f} cores busy on average)')
+    if cache_root:
+        cache = ContentCache(CACHE_NAME, cache_root, args.cache_size * 1024 * 1024)
+        cache.hits, cache.misses = hits, len(sources) - hits
+        cache.stores = cache.misses
+        cache.evict()
+        print(f'  Cache: {cache.report()}')
 
-# Update image data
-img.putdata(new_data)
 
-# Save with transparency
-img.save('e:/modi/assets/broader_ai_logo_transparent.png', 'PNG')
-print('Transparent logo created!')
+if __name__ == '__main__':
+    main()